@@ -0,0 +1,192 @@
+import os
+import asyncio
+import datetime
+import aiohttp
+from api.cache import ResponseCache, cache_key, ttl_for
+from api.nasa_client import (
+    NASAClient, BASE_URL, IMAGES_URL, HEADERS, REQUEST_TIMEOUT,
+    RETRY_TOTAL, RETRY_BACKOFF_FACTOR, RETRY_STATUSES,
+)
+
+# urllib3 caps the backoff sleep at two minutes as well
+BACKOFF_MAX = 120
+
+
+class UpstreamError(aiohttp.ClientError):
+    """Raised when retries are exhausted on a retryable status."""
+
+
+class AsyncNASAClient:
+    """asyncio counterpart of NASAClient backed by a pooled aiohttp session.
+
+    Use as an async context manager:
+
+        async with AsyncNASAClient() as client:
+            apod, neo = await client.gather(client.get_apod(), client.get_neo_feed())
+
+    `concurrency` bounds in-flight requests overall, `limit_per_host` bounds
+    open connections per upstream host. Retries follow the same policy as the
+    sync client's urllib3 Retry adapter.
+    """
+
+    def __init__(self, concurrency=10, limit_per_host=6, cache=None,
+                 base_url=BASE_URL, images_url=IMAGES_URL,
+                 retries=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF_FACTOR, timeout=REQUEST_TIMEOUT):
+        self.api_key = os.getenv("NASA_API_KEY")
+        self.base_url = base_url
+        self.images_url = images_url
+        self.cache = ResponseCache() if cache is None else (cache or None)
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.limit_per_host)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def gather(self, *aws):
+        """Await several client calls concurrently, results in argument order."""
+        return await asyncio.gather(*aws)
+
+    async def _get(self, endpoint, params=None):
+        try:
+            return await self._fetch(f"{self.base_url}{endpoint}", params)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching {endpoint}: {self._redacted(e)}")
+            return NASAClient._get_mock_data(endpoint)
+
+    async def _fetch(self, url, params=None):
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        entry = None
+        if self.cache is not None:
+            key = cache_key(url, params)
+            entry = self.cache.get(key)
+            if entry is not None and entry.fresh:
+                return entry.payload
+        try:
+            payload = await self._request(url, params)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if entry is not None:
+                print(f"Serving cached copy of {url}: {self._redacted(e)}")
+                return entry.payload
+            raise
+        if self.cache is not None:
+            self.cache.set(key, payload, ttl_for(url, params, payload))
+        return payload
+
+    async def _request(self, url, params):
+        if url.startswith(self.base_url) and self.api_key:
+            params = dict(params, api_key=self.api_key)
+        errors = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with self.session.get(url, params=params) as response:
+                        if response.status in RETRY_STATUSES and errors < self.retries:
+                            retry_after = response.headers.get("Retry-After")
+                            raise UpstreamError(f"{response.status} from {url}")
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError, UpstreamError):
+                errors += 1
+                if errors > self.retries:
+                    raise
+                await asyncio.sleep(self._backoff(errors, retry_after))
+
+    def _redacted(self, error):
+        """Error message with the API key masked (aiohttp puts the request URL in it)."""
+        return str(error).replace(self.api_key, "***") if self.api_key else str(error)
+
+    def _backoff(self, errors, retry_after=None):
+        """Sleep before the next attempt, mirroring urllib3's Retry.get_backoff_time."""
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        if errors <= 1:
+            return 0.0
+        return min(BACKOFF_MAX, self.backoff_factor * (2 ** (errors - 1)))
+
+    async def get_apod(self):
+        """Get Astronomy Picture of the Day"""
+        return await self._get("/planetary/apod")
+
+    async def get_neo_feed(self, start_date=None, end_date=None):
+        """Get Near Earth Object Feed"""
+        if not start_date:
+            start_date = datetime.date.today().strftime("%Y-%m-%d")
+        if not end_date:
+            end_date = start_date
+        return await self._get("/neo/rest/v1/feed", {"start_date": start_date, "end_date": end_date})
+
+    async def get_epic_images(self, date=None):
+        """Get EPIC Earth Images"""
+        if date:
+            return await self._get(f"/EPIC/api/natural/date/{date}")
+        return await self._get("/EPIC/api/natural")
+
+    async def get_mars_rover_photos(self, sol=1000, rover="curiosity", camera=None, page=None):
+        """Get Mars Rover Photos
+
+        camera (e.g. "MAHLI") and page (25 photos per page) are applied
+        upstream. rover may be a list of rovers, fetched concurrently and
+        merged into one "photos" list.
+        """
+        params = {"sol": sol}
+        if camera:
+            params["camera"] = camera.lower()
+        if page:
+            params["page"] = page
+        if isinstance(rover, (list, tuple)):
+            results = await self.gather(*(self.get_mars_rover_photos(sol, r, camera, page) for r in rover))
+            return {"photos": [photo for result in results if result for photo in result.get("photos", [])]}
+
+        data = await self._get(f"/mars-photos/api/v1/rovers/{rover}/photos", params)
+        if camera and data and "photos" in data:
+            # No-op upstream; keeps the mock fallback consistent with the filter
+            data = {"photos": [p for p in data["photos"] if p.get("camera", {}).get("name") == camera.upper()]}
+        return data
+
+    async def search_images(self, query):
+        """Search NASA Image and Video Library"""
+        try:
+            return await self._fetch(f"{self.images_url}/search", {"q": query, "media_type": "image"})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error searching images: {e}")
+            return NASAClient._search_mock_data()
+
+
+def fetch_concurrently(calls, **client_kwargs):
+    """Run several AsyncNASAClient calls together from synchronous (Streamlit) code.
+
+    `calls` maps a name to a function taking the client and returning a
+    coroutine, e.g. {"apod": lambda c: c.get_apod()}. Returns {name: result};
+    wall time is that of the slowest call.
+    """
+    async def run():
+        async with AsyncNASAClient(**client_kwargs) as client:
+            names = list(calls)
+            results = await client.gather(*(calls[name](client) for name in names))
+            return dict(zip(names, results))
+
+    return asyncio.run(run())
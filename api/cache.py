@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+
+# Long enough that anything we have is better than mock data during an outage
+STALE_WINDOW = 24 * 3600
+
+
+def cache_key(url, params=None):
+    """Stable key for a request: URL plus sorted params, without the api_key."""
+    params = {k: v for k, v in (params or {}).items() if k != "api_key" and v is not None}
+    raw = url + "?" + json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# APOD's "today" follows US Eastern time, not UTC
+try:
+    from zoneinfo import ZoneInfo
+    APOD_TZ = ZoneInfo("America/New_York")
+except (ImportError, KeyError):
+    # No tz database on this system
+    APOD_TZ = datetime.timezone(datetime.timedelta(hours=-5))
+# Lifetime of a dateless APOD that is still the previous day's picture
+APOD_BEHIND_TTL = 30 * 60
+
+
+def next_apod_rollover():
+    """Timestamp of the next midnight in APOD's timezone."""
+    today = datetime.datetime.now(APOD_TZ).date()
+    return datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time(), tzinfo=APOD_TZ).timestamp()
+
+
+def _is_past(date_str, days=1):
+    """True if date_str (YYYY-MM-DD) is at least `days` days before today (UTC)."""
+    try:
+        date = datetime.date.fromisoformat(str(date_str))
+    except ValueError:
+        return False
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return (today - date).days >= days
+
+
+def ttl_for(url, params=None, payload=None):
+    """Freshness lifetime in seconds for a NASA endpoint.
+
+    APOD changes once a day, EPIC and NEO data for past dates is effectively
+    immutable, while anything covering today may still be updated upstream.
+    payload, if given, lets a dateless APOD that hasn't rolled over yet
+    expire soon instead of at the next rollover.
+    """
+    params = params or {}
+    if url.endswith("/planetary/apod"):
+        if params.get("date"):
+            return 30 * 24 * 3600
+        today = datetime.datetime.now(APOD_TZ).date().isoformat()
+        if isinstance(payload, dict) and payload.get("date") and payload["date"] != today:
+            return APOD_BEHIND_TTL
+        return max(60, int(next_apod_rollover() - time.time()))
+    if "/EPIC/api/" in url:
+        if "/date/" in url and _is_past(url.rsplit("/", 1)[-1], days=3):
+            return 30 * 24 * 3600
+        return 3600
+    if "/neo/rest/v1/feed" in url:
+        if _is_past(params.get("end_date"), days=1):
+            return 7 * 24 * 3600
+        return 3600
+    if "/mars-photos/api/v1/manifests" in url:
+        return 6 * 3600
+    if "/mars-photos/api/v1/rovers" in url:
+        return 24 * 3600
+    if "images-api.nasa.gov" in url:
+        return 24 * 3600
+    return 3600
+
+
+class CacheEntry:
+    def __init__(self, payload, expires_at, etag=None, last_modified=None):
+        self.payload = payload
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def stale_ok(self):
+        """Expired, but recent enough to serve while revalidating."""
+        return time.time() < self.expires_at + STALE_WINDOW
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache for parsed JSON responses.
+
+    The memory tier holds parsed payloads for the hottest keys, the disk tier
+    survives process restarts and is shared by all Streamlit sessions. Both
+    tiers are size bounded; the disk tier evicts least recently used rows.
+    """
+
+    def __init__(self, path=None, max_entries=256, max_disk_bytes=256 * 1024 * 1024):
+        if path is None:
+            cache_dir = os.getenv("NASA_CACHE_DIR", ".cache")
+            path = os.path.join(cache_dir, "nasa_api.sqlite")
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, payload TEXT, expires_at REAL, "
+                    "etag TEXT, last_modified TEXT, size INTEGER, accessed_at REAL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache disabled on disk ({path}): {e}")
+                self._db = None
+
+    def get(self, key):
+        """Return the CacheEntry for key (fresh or not), or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT payload, expires_at, etag, last_modified FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache read failed: {e}")
+                return None
+            entry = CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+            self._remember(key, entry)
+            return entry
+
+    def set(self, key, payload, ttl, etag=None, last_modified=None):
+        entry = CacheEntry(payload, time.time() + ttl, etag, last_modified)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is None:
+                return entry
+            try:
+                blob = json.dumps(payload)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, blob, entry.expires_at, etag, last_modified, len(blob), time.time()),
+                )
+                self._evict_disk()
+                self._db.commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"Response cache write failed: {e}")
+        return entry
+
+    def touch(self, key, ttl):
+        """Extend the lifetime of an entry that upstream confirmed unchanged."""
+        with self._lock:
+            entry = self.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = time.time() + ttl
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                        (entry.expires_at, time.time(), key),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Response cache write failed: {e}")
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # Drop least recently used rows until we are back under the bound
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
@@ -1,44 +1,215 @@
 import os
 import requests
 import datetime
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from api.cache import ResponseCache, cache_key, ttl_for
+from api.singleflight import SingleFlight
+from api.transport import make_transport
+from utils import metrics
 
 load_dotenv()
 
+BASE_URL = "https://api.nasa.gov"
+IMAGES_URL = "https://images-api.nasa.gov"
+
+# Shared by the sync and async clients
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 1
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+REQUEST_TIMEOUT = 60
+
+# The NeoWs feed rejects ranges longer than 7 days
+NEO_FEED_MAX_DAYS = 7
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Metric label per endpoint family, so dates and sols don't create new series
+ENDPOINT_LABELS = (
+    ("/planetary/apod", "apod"),
+    ("/neo/rest/v1/feed", "neo_feed"),
+    ("/EPIC/api", "epic"),
+    ("/mars-photos/api/v1/manifests", "rover_manifest"),
+    ("/mars-photos/api/v1/rovers", "rover_photos"),
+    ("/search", "image_search"),
+)
+
+def endpoint_label(url):
+    path = urlsplit(url).path
+    for prefix, label in ENDPOINT_LABELS:
+        if path.startswith(prefix):
+            return label
+    return "other"
+
+# Connection pool sizing for the shared session, see get_client()
+POOL_CONNECTIONS = int(os.getenv("NASA_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("NASA_POOL_MAXSIZE", "32"))
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
 class NASAClient:
-    def __init__(self):
+    def __init__(self, cache=None, base_url=BASE_URL, images_url=IMAGES_URL,
+                 pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, transport=None):
         self.api_key = os.getenv("NASA_API_KEY")
-        self.base_url = "https://api.nasa.gov"
+        self.base_url = base_url
+        self.images_url = images_url
+        # Pass cache=False to always hit the network
+        self.cache = ResponseCache() if cache is None else (cache or None)
+        # Identical concurrent requests share one upstream call
+        self._inflight = SingleFlight()
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
         
         # Configure session with retry strategy
         self.session = requests.Session()
         retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            total=RETRY_TOTAL,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # One pool per upstream host; pool_maxsize bounds keep-alive sockets
+        # per host, so size it for the number of concurrent sessions/threads
+        adapter = HTTPAdapter(max_retries=retry_strategy,
+                              pool_connections=pool_connections, pool_maxsize=pool_maxsize)
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
+        # live / record / replay / fallback, from NASA_TRANSPORT unless given (see api.transport)
+        self.transport = transport or make_transport(self.session)
 
     def _get(self, endpoint, params=None):
-        if params is None:
-            params = {}
-        params['api_key'] = self.api_key
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
         try:
-            response = self.session.get(f"{self.base_url}{endpoint}", params=params, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"{self.base_url}{endpoint}", params)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching {endpoint}: {e}")
+            metrics.inc("nasa_mock_fallbacks_total", endpoint=endpoint_label(endpoint))
             return self._get_mock_data(endpoint) # Fallback to mock data
 
-    def _get_mock_data(self, endpoint):
+    def _fetch(self, url, params=None, refresh=False):
+        """GET url through the response cache. Raises RequestException on failure.
+
+        Fresh entries are returned directly, stale ones are returned while a
+        background thread revalidates them. refresh=True skips the cache lookup.
+        """
+        params = dict(params or {})
+        key = cache_key(url, params)
+        if self.cache is None:
+            return self._inflight.do(key, lambda: self._request(url, params, None, None))
+
+        entry = self.cache.get(key)
+        if entry is not None and not refresh:
+            if entry.fresh:
+                metrics.inc("nasa_cache_total", endpoint=endpoint_label(url), result="fresh")
+                return entry.payload
+            if entry.stale_ok:
+                metrics.inc("nasa_cache_total", endpoint=endpoint_label(url), result="stale")
+                self._revalidate_async(key, url, params, entry)
+                return entry.payload
+        metrics.inc("nasa_cache_total", endpoint=endpoint_label(url), result="miss")
+        def load():
+            # A call that finished just before we joined may have filled the cache
+            latest = self.cache.get(key)
+            if latest is not None and latest.fresh and not refresh:
+                return latest.payload
+            return self._request(url, params, key, entry)
+
+        try:
+            return self._inflight.do(key, load)
+        except requests.exceptions.RequestException as e:
+            if entry is not None:
+                # Upstream is down: an old copy beats mock data
+                print(f"Serving cached copy of {url}: {e}")
+                metrics.inc("nasa_cache_total", endpoint=endpoint_label(url), result="stale_on_error")
+                return entry.payload
+            raise
+
+    def warm(self, endpoint, params=None):
+        """Make sure the cache holds a fresh copy of endpoint and return it.
+
+        Unlike _get this never serves stale or mock data: it fetches
+        synchronously when needed and raises RequestException on failure.
+        """
+        url = endpoint if endpoint.startswith("http") else f"{self.base_url}{endpoint}"
+        key = cache_key(url, params)
+        if self.cache is None:
+            return self._inflight.do(key, lambda: self._request(url, dict(params or {}), None, None))
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            return entry.payload
+        return self._inflight.do(key, lambda: self._request(url, dict(params or {}), key, entry))
+
+    def _request(self, url, params, key, entry):
+        if url.startswith(self.base_url):
+            params['api_key'] = self.api_key
+        headers = HEADERS
+        if entry is not None and (entry.etag or entry.last_modified):
+            # Conditional request: an unchanged payload comes back as a bodyless 304
+            headers = dict(HEADERS)
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        endpoint = endpoint_label(url)
+        metrics.inc("nasa_requests_total", endpoint=endpoint)
+        try:
+            with metrics.timer("nasa_request_ms", endpoint=endpoint):
+                response = self.transport.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            metrics.inc("nasa_request_errors_total", endpoint=endpoint, error=type(e).__name__)
+            raise self._redacted(e) from None
+        if metrics.ENABLED:
+            # urllib3 records the retries it made (and why) on the final response
+            history = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+            if history:
+                metrics.inc("nasa_retries_total", len(history), endpoint=endpoint)
+            metrics.inc("nasa_responses_total", endpoint=endpoint, status=response.status_code)
+            metrics.inc("nasa_response_bytes_total", len(response.content), endpoint=endpoint)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key, ttl_for(url, params, entry.payload))
+            return entry.payload
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise self._redacted(e) from None
+        with metrics.timer("nasa_json_parse_ms", endpoint=endpoint):
+            payload = response.json()
+        if key is not None:
+            self.cache.set(key, payload, ttl_for(url, params, payload),
+                           etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"))
+        return payload
+
+    def _redacted(self, error):
+        """error with the API key masked, since request URLs end up in its message and callers print it."""
+        if not self.api_key or self.api_key not in str(error):
+            return error
+        return type(error)(str(error).replace(self.api_key, "***"), request=error.request, response=error.response)
+
+    def _revalidate_async(self, key, url, params, entry):
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                self._inflight.do(key, lambda: self._request(url, dict(params), key, entry))
+            except requests.exceptions.RequestException as e:
+                print(f"Background refresh of {url} failed: {e}")
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @staticmethod
+    def _get_mock_data(endpoint):
         """Return mock data for demonstration purposes when API fails."""
         if endpoint == "/planetary/apod":
             return {
@@ -92,6 +263,49 @@ class NASAClient:
         
         return self._get("/neo/rest/v1/feed", {"start_date": start_date, "end_date": end_date})
 
+    def get_neo_feed_range(self, start_date, end_date, max_workers=8):
+        """Get Near Earth Object Feed for any date range.
+
+        The range is split into 7-day windows that are fetched concurrently and
+        merged. Failed windows are listed under "errors" instead of being
+        replaced with mock data.
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.date.fromisoformat(start_date)
+        if isinstance(end_date, str):
+            end_date = datetime.date.fromisoformat(end_date)
+        if end_date < start_date:
+            start_date, end_date = end_date, start_date
+
+        windows = []
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(window_start + datetime.timedelta(days=NEO_FEED_MAX_DAYS - 1), end_date)
+            windows.append((window_start.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")))
+            window_start = window_end + datetime.timedelta(days=1)
+
+        def fetch(window):
+            params = {"start_date": window[0], "end_date": window[1]}
+            return self._fetch(f"{self.base_url}/neo/rest/v1/feed", params)
+
+        merged = {"element_count": 0, "near_earth_objects": {}, "errors": []}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as pool:
+            futures = [(window, pool.submit(fetch, window)) for window in windows]
+            for window, future in futures:
+                try:
+                    data = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching NEO feed {window[0]}..{window[1]}: {e}")
+                    merged["errors"].append({"start_date": window[0], "end_date": window[1], "error": str(e)})
+                    continue
+                merged["near_earth_objects"].update(data.get("near_earth_objects", {}))
+                merged["element_count"] += data.get("element_count", 0)
+        return merged
+
+    def get_rover_manifest(self, rover="curiosity"):
+        """Get mission manifest (max_sol, photos per sol) for a rover"""
+        return self._get(f"/mars-photos/api/v1/manifests/{rover}")
+
     def get_epic_images(self, date=None):
         """Get EPIC Earth Images"""
         # Default to most recent available date usually involves checking /api/natural, 
@@ -100,34 +314,142 @@ class NASAClient:
              return self._get(f"/EPIC/api/natural/date/{date}")
         return self._get("/EPIC/api/natural")
 
-    def get_mars_rover_photos(self, sol=1000, rover="curiosity"):
-        """Get Mars Rover Photos"""
-        return self._get(f"/mars-photos/api/v1/rovers/{rover}/photos", {"sol": sol})
+    def get_mars_rover_photos(self, sol=1000, rover="curiosity", camera=None, page=None):
+        """Get Mars Rover Photos
+
+        camera (e.g. "MAHLI") and page (25 photos per page) are applied
+        upstream. rover may be a list of rovers, fetched concurrently and
+        merged into one "photos" list.
+        """
+        params = {"sol": sol}
+        if camera:
+            params["camera"] = camera.lower()
+        if page:
+            params["page"] = page
+        if isinstance(rover, (list, tuple)):
+            with ThreadPoolExecutor(max_workers=max(1, len(rover))) as pool:
+                results = list(pool.map(lambda r: self.get_mars_rover_photos(sol, r, camera, page), rover))
+            return {"photos": [photo for result in results if result for photo in result.get("photos", [])]}
+
+        data = self._get(f"/mars-photos/api/v1/rovers/{rover}/photos", params)
+        if camera and data and "photos" in data:
+            # No-op upstream; keeps the mock fallback consistent with the filter
+            data = {"photos": [p for p in data["photos"] if p.get("camera", {}).get("name") == camera.upper()]}
+        return data
 
     def search_images(self, query):
         """Search NASA Image and Video Library (Different Base URL)"""
-        url = "https://images-api.nasa.gov/search"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
         try:
-            response = self.session.get(url, params={"q": query, "media_type": "image"}, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch(f"{self.images_url}/search", {"q": query, "media_type": "image"})
         except requests.exceptions.RequestException as e:
             print(f"Error searching images: {e}")
-            # Mock Search Results
-            return {
-                "collection": {
-                    "items": [
-                        {
-                            "data": [{"title": "Mock Search Result 1", "description": "Mock description", "nasa_id": "1"}],
-                            "links": [{"href": "https://upload.wikimedia.org/wikipedia/commons/e/e1/FullMoon2010.jpg"}]
-                        },
-                         {
-                            "data": [{"title": "Mock Search Result 2", "description": "Mock description", "nasa_id": "2"}],
-                            "links": [{"href": "https://upload.wikimedia.org/wikipedia/commons/b/b4/The_Sun_by_the_Atmospheric_Imaging_Assembly_of_NASA%27s_Solar_Dynamics_Observatory_-_20100819.jpg"}]
-                        }
-                    ]
-                }
+            metrics.inc("nasa_mock_fallbacks_total", endpoint="image_search")
+            return self._search_mock_data()
+
+    def iter_search(self, query, media_type="image", prefetch=True):
+        """Lazily yield compact search results, following "next" page links.
+
+        Each record is {"nasa_id", "title", "description", "thumb", "full", "date_created"};
+        "full" is the original image when the result links one.
+        Only the current page is held in memory; with prefetch=True the next
+        page is requested in the background while the caller consumes this one.
+        """
+        try:
+            page = self._fetch(f"{self.images_url}/search", {"q": query, "media_type": media_type})
+        except requests.exceptions.RequestException as e:
+            print(f"Error searching images: {e}")
+            metrics.inc("nasa_mock_fallbacks_total", endpoint="image_search")
+            page = self._search_mock_data()
+
+        pool = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            while page:
+                collection = page.get("collection", {})
+                next_href = next((link["href"] for link in collection.get("links", [])
+                                  if link.get("rel") == "next"), None)
+                upcoming = pool.submit(self._fetch_link, next_href) if pool and next_href else None
+
+                for item in collection.get("items", []):
+                    yield self._compact_item(item)
+
+                if not next_href:
+                    break
+                try:
+                    page = upcoming.result() if upcoming else self._fetch_link(next_href)
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching next search page: {e}")
+                    break
+        finally:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_link(self, href):
+        # Split the query string out so the cache key matches other calls
+        parts = urlsplit(href)
+        url = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        return self._fetch(url, dict(parse_qsl(parts.query)))
+
+    @staticmethod
+    def _compact_item(item):
+        data = (item.get("data") or [{}])[0]
+        links = item.get("links") or []
+        by_rel = {}
+        for link in links:
+            by_rel.setdefault(link.get("rel"), []).append(link["href"])
+        thumb = by_rel.get("preview", [links[0]["href"] if links else None])[0]
+        # Original image, else the largest alternate rendition, else the preview
+        alternates = by_rel.get("alternate", [])
+        full = (by_rel.get("canonical") or [href for href in alternates if "~large" in href]
+                or alternates or [thumb])[0]
+        return {
+            "nasa_id": data.get("nasa_id"),
+            "title": data.get("title", "No Title"),
+            "description": data.get("description", "No description."),
+            "thumb": thumb,
+            "full": full,
+            "date_created": data.get("date_created"),
+        }
+
+    @staticmethod
+    def _search_mock_data():
+        """Mock Search Results"""
+        return {
+            "collection": {
+                "items": [
+                    {
+                        "data": [{"title": "Mock Search Result 1", "description": "Mock description", "nasa_id": "1"}],
+                        "links": [{"href": "https://upload.wikimedia.org/wikipedia/commons/e/e1/FullMoon2010.jpg"}]
+                    },
+                     {
+                        "data": [{"title": "Mock Search Result 2", "description": "Mock description", "nasa_id": "2"}],
+                        "links": [{"href": "https://upload.wikimedia.org/wikipedia/commons/b/b4/The_Sun_by_the_Atmospheric_Imaging_Assembly_of_NASA%27s_Solar_Dynamics_Observatory_-_20100819.jpg"}]
+                    }
+                ]
             }
+        }
+
+
+def epic_image_url(image, variant="png"):
+    """Archive URL of an EPIC image record.
+
+    variant "png" is the full-resolution original (several MB), "jpg" a
+    compressed full-size copy and "thumbs" a small JPEG preview.
+    """
+    year, month, day = image["date"].split(" ")[0].split("-")
+    extension = "png" if variant == "png" else "jpg"
+    return f"https://epic.gsfc.nasa.gov/archive/natural/{year}/{month}/{day}/{variant}/{image['image']}.{extension}"
+
+
+def get_client():
+    """Process-wide NASAClient shared by all pages, sessions and reruns.
+
+    Reusing one client keeps its pooled keep-alive connections (and the
+    in-memory cache tier) warm instead of opening new TCP/TLS connections on
+    every rerun. NASAClient is safe to use from several threads at once.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = NASAClient()
+    return _shared_client
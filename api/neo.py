@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+NEO_COLUMNS = [
+    "id", "name", "diameter_min_km", "diameter_max_km", "hazardous",
+    "miss_distance_km", "velocity_kph", "close_approach_date", "approach_time", "orbiting_body",
+]
+
+
+def flatten_neo_feed(*feeds):
+    """Flatten one or more NeoWs feed payloads into a typed DataFrame.
+
+    Produces one row per close approach (not just the first one per object),
+    with float64 distance/velocity/diameter columns, a bool hazard flag and
+    a UTC `approach_time` column. The payloads are walked once, collecting
+    plain column lists; string-to-float parsing happens in NumPy afterwards.
+    """
+    ids, names, dmin, dmax, hazardous = [], [], [], [], []
+    miss, velocity, approach_date, epoch_ms, body = [], [], [], [], []
+
+    for feed in feeds:
+        if not feed:
+            continue
+        for objects in feed.get("near_earth_objects", {}).values():
+            for obj in objects:
+                diameter = obj.get("estimated_diameter", {}).get("kilometers", {})
+                for cad in obj.get("close_approach_data") or ():
+                    ids.append(obj.get("id"))
+                    names.append(obj.get("name"))
+                    dmin.append(diameter.get("estimated_diameter_min", np.nan))
+                    dmax.append(diameter.get("estimated_diameter_max", np.nan))
+                    hazardous.append(obj.get("is_potentially_hazardous_asteroid", False))
+                    miss.append(cad.get("miss_distance", {}).get("kilometers", np.nan))
+                    velocity.append(cad.get("relative_velocity", {}).get("kilometers_per_hour", np.nan))
+                    approach_date.append(cad.get("close_approach_date_full") or cad.get("close_approach_date"))
+                    epoch_ms.append(cad.get("epoch_date_close_approach", np.nan))
+                    body.append(cad.get("orbiting_body"))
+
+    epoch_ms = np.asarray(epoch_ms, dtype=np.float64)
+    approach_time = pd.Series(pd.to_datetime(epoch_ms, unit="ms", utc=True))
+    missing = np.isnan(epoch_ms)
+    if missing.any():
+        # Mock data and older payloads only carry the formatted date
+        approach_time[missing] = pd.to_datetime(pd.Series(approach_date, dtype=object)[missing],
+                                                format="%Y-%b-%d %H:%M", errors="coerce", utc=True)
+
+    df = pd.DataFrame({
+        "id": pd.Series(ids, dtype=object),
+        "name": pd.Series(names, dtype=object),
+        "diameter_min_km": np.asarray(dmin, dtype=np.float64),
+        "diameter_max_km": np.asarray(dmax, dtype=np.float64),
+        "hazardous": np.asarray(hazardous, dtype=bool),
+        "miss_distance_km": np.asarray(miss, dtype=np.float64),
+        "velocity_kph": np.asarray(velocity, dtype=np.float64),
+        "close_approach_date": pd.Series(approach_date, dtype=object),
+        "approach_time": approach_time,
+        "orbiting_body": pd.Series(body, dtype=object),
+    }, columns=NEO_COLUMNS)
+    return df
+
+
+def hazardous_neos(df):
+    """Rows of a flattened feed that are potentially hazardous."""
+    return df[df["hazardous"]]
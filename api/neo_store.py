@@ -0,0 +1,201 @@
+import os
+import time
+import sqlite3
+import datetime
+import threading
+import pandas as pd
+from api.nasa_client import get_client
+from api.neo import flatten_neo_feed, NEO_COLUMNS
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def _as_date(value):
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _days(start_date, end_date):
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    return [start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+def _runs(days):
+    """Split sorted dates into (first, last) runs of consecutive days."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == datetime.timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+class NeoStore:
+    """
+    Local SQLite history of NEO close approaches, one row per (NEO id, approach time).
+
+    sync() fetches only the days in a range that are not stored yet; days
+    from today onward are re-fetched on every sync because the feed for them
+    can still change. Range, ranking and monthly queries then run locally.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(os.getenv("NASA_CACHE_DIR", ".cache"), "neo_approaches.sqlite")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS approaches (
+                id TEXT, approach_ms INTEGER, day TEXT, name TEXT,
+                diameter_min_km REAL, diameter_max_km REAL, hazardous INTEGER,
+                miss_distance_km REAL, velocity_kph REAL, close_approach_date TEXT,
+                orbiting_body TEXT, PRIMARY KEY (id, approach_ms));
+            CREATE INDEX IF NOT EXISTS approaches_day ON approaches (day);
+            CREATE INDEX IF NOT EXISTS approaches_miss_distance ON approaches (miss_distance_km);
+            CREATE INDEX IF NOT EXISTS approaches_velocity ON approaches (velocity_kph);
+            CREATE INDEX IF NOT EXISTS approaches_hazardous ON approaches (hazardous, velocity_kph);
+            CREATE TABLE IF NOT EXISTS synced_days (
+                day TEXT PRIMARY KEY, approach_count INTEGER, final INTEGER, synced_at REAL);
+        """)
+        self._db.commit()
+
+    def missing_days(self, start_date, end_date):
+        """Days in the range that are not stored, or were stored before they were final."""
+        days = _days(start_date, end_date)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT day FROM synced_days WHERE final = 1 AND day BETWEEN ? AND ?",
+                (days[0].isoformat(), days[-1].isoformat()),
+            ).fetchall()
+        done = {day for (day,) in rows}
+        return [day for day in days if day.isoformat() not in done]
+
+    def sync(self, start_date, end_date, client=None, max_workers=8, refresh=False):
+        """
+        Fetch and store every missing day in the range.
+        Returns {"synced": [days], "errors": [{start_date, end_date, error}]};
+        days in failed windows stay missing so a later sync retries them.
+        """
+        client = client or get_client()
+        todo = _days(start_date, end_date) if refresh else self.missing_days(start_date, end_date)
+        result = {"synced": [], "errors": []}
+        for first, last in _runs(todo):
+            data = client.get_neo_feed_range(first, last, max_workers=max_workers)
+            failed = set()
+            for error in data["errors"]:
+                failed.update(_days(error["start_date"], error["end_date"]))
+            days = [day for day in _days(first, last) if day not in failed]
+            self.ingest(days, flatten_neo_feed(data))
+            result["synced"] += [day.isoformat() for day in days]
+            result["errors"] += data["errors"]
+        return result
+
+    def ingest(self, days, df):
+        """Replace the stored approaches of `days` with the rows of a flattened feed."""
+        if not days:
+            return
+        df = df[df["approach_time"].notna()]
+        day = df["approach_time"].dt.strftime("%Y-%m-%d")
+        wanted = {d.isoformat() for d in days}
+        df, day = df[day.isin(wanted)], day[day.isin(wanted)]
+        approach_ms = (df["approach_time"] - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)
+        rows = list(zip(
+            df["id"], approach_ms, day, df["name"],
+            df["diameter_min_km"], df["diameter_max_km"], df["hazardous"].astype(int),
+            df["miss_distance_km"], df["velocity_kph"], df["close_approach_date"], df["orbiting_body"],
+        ))
+        counts = day.value_counts()
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        now = time.time()
+        with self._lock:
+            self._db.executemany("DELETE FROM approaches WHERE day = ?", [(d,) for d in sorted(wanted)])
+            self._db.executemany("INSERT OR REPLACE INTO approaches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO synced_days VALUES (?, ?, ?, ?)",
+                [(d.isoformat(), int(counts.get(d.isoformat(), 0)), int(d < today), now) for d in days],
+            )
+            self._db.commit()
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            df = pd.read_sql_query(sql, self._db, params=list(args))
+        if "approach_ms" in df:
+            df.insert(df.columns.get_loc("approach_ms"), "approach_time",
+                      pd.to_datetime(df.pop("approach_ms"), unit="ms", utc=True))
+        if "hazardous" in df:
+            df["hazardous"] = df["hazardous"].astype(bool)
+        return df
+
+    def _range(self, start_date, end_date):
+        clauses, args = [], []
+        if start_date is not None:
+            clauses.append("day >= ?")
+            args.append(_as_date(start_date).isoformat())
+        if end_date is not None:
+            clauses.append("day <= ?")
+            args.append(_as_date(end_date).isoformat())
+        return clauses, args
+
+    def _select(self, clauses, args, order, limit=None):
+        columns = ", ".join("approach_ms" if c == "approach_time" else c for c in NEO_COLUMNS)
+        sql = f"SELECT {columns} FROM approaches"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order} LIMIT ?"
+        return self._query(sql, args + [-1 if limit is None else limit])
+
+    def approaches(self, start_date=None, end_date=None):
+        """Stored approaches in the range as a DataFrame with flatten_neo_feed's columns."""
+        clauses, args = self._range(start_date, end_date)
+        return self._select(clauses, args, "approach_ms")
+
+    def closest_approaches(self, start_date=None, end_date=None, limit=10, hazardous_only=False):
+        clauses, args = self._range(start_date, end_date)
+        if hazardous_only:
+            clauses.append("hazardous = 1")
+        return self._select(clauses, args, "miss_distance_km", limit)
+
+    def fastest_hazardous(self, limit=10, start_date=None, end_date=None):
+        clauses, args = self._range(start_date, end_date)
+        clauses.append("hazardous = 1")
+        return self._select(clauses, args, "velocity_kph DESC", limit)
+
+    def monthly_counts(self, start_date=None, end_date=None):
+        """Approaches, distinct objects and hazardous approaches per month ("YYYY-MM")."""
+        clauses, args = self._range(start_date, end_date)
+        sql = ("SELECT substr(day, 1, 7) AS month, COUNT(*) AS approaches, "
+               "COUNT(DISTINCT id) AS objects, SUM(hazardous) AS hazardous_approaches FROM approaches")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY month ORDER BY month"
+        return self._query(sql, args)
+
+    def version(self):
+        """
+        Changes whenever any process writes to the file (every ingest stamps
+        synced_at), so callers can cache query results per version.
+        """
+        with self._lock:
+            return self._db.execute("SELECT MAX(synced_at), COUNT(*) FROM synced_days").fetchone()
+
+    def stored_range(self):
+        """(first_day, last_day) of synced days, or None if the store is empty."""
+        with self._lock:
+            first, last = self._db.execute("SELECT MIN(day), MAX(day) FROM synced_days").fetchone()
+        return (first, last) if first else None
+
+
+def get_neo_store():
+    """Process-wide NeoStore."""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = NeoStore()
+    return _shared_store
@@ -0,0 +1,133 @@
+import os
+import time
+import random
+import datetime
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from api.nasa_client import get_client
+from api.cache import next_apod_rollover
+
+# Seconds between regular warm-up cycles; 0 disables the prefetcher
+PREFETCH_INTERVAL = int(os.getenv("ASTROINTEL_PREFETCH_INTERVAL", str(30 * 60)))
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def warm_apod(client):
+    client.warm("/planetary/apod")
+
+
+def warm_neo_today(client):
+    # Same params as the Asteroid Watch default (today..today) so the page hits the cache
+    today = datetime.date.today().strftime("%Y-%m-%d")
+    client.warm("/neo/rest/v1/feed", {"start_date": today, "end_date": today})
+
+
+def warm_epic_latest(client):
+    client.warm("/EPIC/api/natural")
+
+
+def warm_rover_sols(client, rover="curiosity", sols=3):
+    manifest = client.warm(f"/mars-photos/api/v1/manifests/{rover}")
+    max_sol = manifest["photo_manifest"]["max_sol"]
+    for sol in range(max_sol, max(-1, max_sol - sols), -1):
+        client.warm(f"/mars-photos/api/v1/rovers/{rover}/photos", {"sol": sol})
+
+
+DEFAULT_JOBS = {
+    "apod": warm_apod,
+    "neo_today": warm_neo_today,
+    "epic_latest": warm_epic_latest,
+    "rover_sols": warm_rover_sols,
+}
+
+
+class Prefetcher:
+    """Daemon thread that keeps hot NASA datasets in the client's cache.
+
+    Every `interval` seconds (and `midnight_delay` seconds after each UTC
+    midnight, when "today" rolls over, and after APOD's US Eastern midnight)
+    it runs the jobs on at most
+    `max_concurrent` threads. Wake-ups get up to `jitter` seconds of random
+    delay so several processes don't hit upstream in lockstep, and a failing
+    job is retried with exponential backoff instead of waiting a full cycle.
+    """
+
+    def __init__(self, client=None, jobs=None, interval=PREFETCH_INTERVAL, max_concurrent=2,
+                 jitter=30, midnight_delay=120, backoff_base=30, backoff_max=30 * 60):
+        self.client = client or get_client()
+        self.jobs = dict(DEFAULT_JOBS if jobs is None else jobs)
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.jitter = jitter
+        self.midnight_delay = midnight_delay
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = {name: 0 for name in self.jobs}
+        self.retry_at = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="astrointel-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, names=None):
+        """Run the given jobs (default: all) now, returning {name: error or None}."""
+        names = list(self.jobs if names is None else names)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrent)) as pool:
+            futures = {name: pool.submit(self.jobs[name], self.client) for name in names}
+        results = {}
+        for name, future in futures.items():
+            try:
+                future.result()
+                self.failures[name] = 0
+                self.retry_at.pop(name, None)
+                results[name] = None
+            except (requests.exceptions.RequestException, KeyError, TypeError) as e:
+                self.failures[name] += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (self.failures[name] - 1))
+                self.retry_at[name] = time.time() + delay
+                print(f"Prefetch of {name} failed (retry in {delay}s): {e}")
+                results[name] = e
+        return results
+
+    def _next_midnight(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        midnight = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return min(midnight.timestamp(), next_apod_rollover()) + self.midnight_delay
+
+    def _loop(self):
+        next_cycle = time.time()
+        next_midnight = self._next_midnight()
+        while not self._stop.is_set():
+            now = time.time()
+            if now >= next_cycle or now >= next_midnight:
+                self.run_once()
+                next_cycle = now + self.interval
+                if now >= next_midnight:
+                    next_midnight = self._next_midnight()
+            else:
+                due = [name for name, at in self.retry_at.items() if at <= now]
+                if due:
+                    self.run_once(due)
+            wake = min([next_cycle, next_midnight] + list(self.retry_at.values()))
+            self._stop.wait(max(1.0, wake - time.time()) + random.uniform(0, self.jitter))
+
+
+def start_prefetcher(**kwargs):
+    """Start the process-wide prefetcher once; later calls (e.g. reruns) are no-ops."""
+    global _prefetcher
+    if kwargs.get("interval", PREFETCH_INTERVAL) <= 0:
+        return None
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(**kwargs).start()
+    return _prefetcher
@@ -0,0 +1,176 @@
+import os
+import time
+import datetime
+import sqlite3
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from api.nasa_client import get_client
+
+# Raw images for a sol keep arriving for days; sols this close to the
+# manifest's max_sol, or photographed this recently, are re-synced
+RECENT_SOLS = 14
+FINAL_AFTER_DAYS = 14
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+class RoverPhotoIndex:
+    """
+    Local SQLite index of rover photo manifests keyed by rover/sol/camera.
+
+    sync() downloads each sol's full photo list (concurrently for a range
+    of sols) and only downloads it again while the sol is recent enough for
+    more photos to arrive; browsing and "which sols have MAHLI images" questions
+    are then answered from the index without touching the API.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(os.getenv("NASA_CACHE_DIR", ".cache"), "rover_photos.sqlite")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS photos (
+                id INTEGER PRIMARY KEY, rover TEXT, sol INTEGER, camera TEXT,
+                camera_full_name TEXT, img_src TEXT, earth_date TEXT);
+            CREATE INDEX IF NOT EXISTS photos_rover_sol_camera ON photos (rover, sol, camera);
+            CREATE INDEX IF NOT EXISTS photos_rover_camera_sol ON photos (rover, camera, sol);
+            CREATE TABLE IF NOT EXISTS synced_sols (
+                rover TEXT, sol INTEGER, photo_count INTEGER, synced_at REAL,
+                final INTEGER DEFAULT 0, PRIMARY KEY (rover, sol));
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(synced_sols)")}
+        if "final" not in columns:
+            # Indexes from before sols could be incomplete: re-sync everything once
+            self._db.execute("ALTER TABLE synced_sols ADD COLUMN final INTEGER DEFAULT 0")
+        self._db.commit()
+
+    def synced_sols(self, rover, sols):
+        """Sols in `sols` whose photo list is indexed and final."""
+        sols = list(sols)
+        if not sols:
+            return set()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT sol FROM synced_sols WHERE rover = ? AND final = 1 AND sol BETWEEN ? AND ?",
+                (rover, min(sols), max(sols)),
+            ).fetchall()
+        return {sol for (sol,) in rows}
+
+    def sync(self, rover, sols, client=None, max_workers=8, refresh=False):
+        """
+        Fetch every sol in `sols` that is not indexed as final, concurrently,
+        and index it.
+        Returns {"synced": [sols], "errors": {sol: message}}; failed sols are
+        left unindexed (never filled with mock data) so a later sync retries them.
+        """
+        client = client or get_client()
+        rover = rover.lower()
+        sols = sorted(set(sols))
+        todo = sols if refresh else [sol for sol in sols if sol not in self.synced_sols(rover, sols)]
+        result = {"synced": [], "errors": {}}
+        if not todo:
+            return result
+
+        max_sol = self._max_sol(client, rover)
+        url = f"{client.base_url}/mars-photos/api/v1/rovers/{rover}/photos"
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo)))) as pool:
+            futures = {pool.submit(client.warm, url, {"sol": sol}): sol for sol in todo}
+            for future in as_completed(futures):
+                sol = futures[future]
+                try:
+                    self.ingest(rover, sol, future.result().get("photos", []), max_sol)
+                    result["synced"].append(sol)
+                except (requests.exceptions.RequestException, AttributeError) as e:
+                    result["errors"][sol] = str(e)
+        result["synced"].sort()
+        return result
+
+    @staticmethod
+    def _max_sol(client, rover):
+        try:
+            return client.warm(f"/mars-photos/api/v1/manifests/{rover}")["photo_manifest"]["max_sol"]
+        except (requests.exceptions.RequestException, KeyError, TypeError) as e:
+            print(f"Could not read the {rover} manifest: {e}")
+            return None
+
+    def ingest(self, rover, sol, photos, max_sol=None):
+        """
+        Replace the indexed photos of one rover/sol with an API photo list.
+        The sol is final (never re-synced) once it is RECENT_SOLS behind
+        max_sol or its photos are FINAL_AFTER_DAYS old.
+        """
+        rows = [
+            (p["id"], rover, sol, p.get("camera", {}).get("name"), p.get("camera", {}).get("full_name"),
+             p.get("img_src"), p.get("earth_date"))
+            for p in photos
+        ]
+        earth_dates = [row[6] for row in rows if row[6]]
+        cutoff = (datetime.datetime.now(datetime.timezone.utc).date()
+                  - datetime.timedelta(days=FINAL_AFTER_DAYS)).isoformat()
+        final = (max_sol is not None and sol <= max_sol - RECENT_SOLS) or \
+                (bool(earth_dates) and max(earth_dates) <= cutoff)
+        with self._lock:
+            self._db.execute("DELETE FROM photos WHERE rover = ? AND sol = ?", (rover, sol))
+            self._db.executemany("INSERT OR REPLACE INTO photos VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO synced_sols VALUES (?, ?, ?, ?, ?)",
+                             (rover, sol, len(rows), time.time(), int(final)))
+            self._db.commit()
+
+    def photos(self, rover, sol=None, camera=None, limit=None, offset=0):
+        """Indexed photos as dicts shaped like the API's (img_src, rover.name, camera.name/full_name)."""
+        query = "SELECT id, rover, sol, camera, camera_full_name, img_src, earth_date FROM photos WHERE rover = ?"
+        args = [rover.lower()]
+        if sol is not None:
+            query += " AND sol = ?"
+            args.append(sol)
+        if camera:
+            query += " AND camera = ?"
+            args.append(camera.upper())
+        query += " ORDER BY sol, id LIMIT ? OFFSET ?"
+        args += [-1 if limit is None else limit, offset]
+        with self._lock:
+            rows = self._db.execute(query, args).fetchall()
+        return [
+            {"id": id_, "sol": sol_, "img_src": img_src, "earth_date": earth_date,
+             "rover": {"name": rover_.capitalize()}, "camera": {"name": cam, "full_name": full_name}}
+            for id_, rover_, sol_, cam, full_name, img_src, earth_date in rows
+        ]
+
+    def count(self, rover, sol, camera=None):
+        query = "SELECT COUNT(*) FROM photos WHERE rover = ? AND sol = ?"
+        args = [rover.lower(), sol]
+        if camera:
+            query += " AND camera = ?"
+            args.append(camera.upper())
+        with self._lock:
+            return self._db.execute(query, args).fetchone()[0]
+
+    def sols_with_camera(self, rover, camera, first_sol=None, last_sol=None):
+        """[(sol, photo_count)] of indexed sols that have photos from camera."""
+        query = "SELECT sol, COUNT(*) FROM photos WHERE rover = ? AND camera = ?"
+        args = [rover.lower(), camera.upper()]
+        if first_sol is not None:
+            query += " AND sol >= ?"
+            args.append(first_sol)
+        if last_sol is not None:
+            query += " AND sol <= ?"
+            args.append(last_sol)
+        query += " GROUP BY sol ORDER BY sol"
+        with self._lock:
+            return self._db.execute(query, args).fetchall()
+
+
+def get_rover_index():
+    """Process-wide RoverPhotoIndex."""
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                _shared_index = RoverPhotoIndex()
+    return _shared_index
@@ -0,0 +1,118 @@
+import io
+import os
+import hashlib
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from api.nasa_client import get_client, HEADERS
+
+THUMB_SIZE = (480, 480)
+IMAGE_TIMEOUT = 30
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+class ThumbnailCache:
+    """
+    Downscaled copies of remote images in a size-bounded on-disk LRU cache.
+
+    thumbnails() downloads originals concurrently over the shared client's
+    pooled session, resizes and re-encodes them (WebP by default) on a
+    worker pool, and returns local file paths that pages hand to st.image
+    instead of multi-megabyte original URLs. Files are keyed by URL and
+    output settings; a hit bumps the file's mtime, which eviction uses as
+    the recency order.
+    """
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024, size=THUMB_SIZE,
+                 image_format="WEBP", quality=80, max_workers=8, session=None):
+        if directory is None:
+            directory = os.path.join(os.getenv("NASA_CACHE_DIR", ".cache"), "thumbnails")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.image_format = image_format.upper()
+        self.quality = quality
+        self.session = session or get_client().session
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnails")
+        self._evict_lock = threading.Lock()
+
+    def path_for(self, url):
+        key = f"{url}|{self.size[0]}x{self.size[1]}|{self.image_format}|{self.quality}"
+        extension = "jpg" if self.image_format == "JPEG" else self.image_format.lower()
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode()).hexdigest()}.{extension}")
+
+    def thumbnail(self, url):
+        return self.thumbnails([url])[0]
+
+    def thumbnails(self, urls):
+        """
+        Local thumbnail path for each URL, in order. URLs that cannot be
+        fetched or decoded come back unchanged so pages still show the original.
+        """
+        results = list(self._pool.map(self._thumbnail, urls))
+        if any(created for _, created in results):
+            self._evict()
+        return [path for path, _ in results]
+
+    def _thumbnail(self, url):
+        path = self.path_for(url)
+        if os.path.exists(path):
+            os.utime(path)
+            return path, False
+        try:
+            response = self.session.get(url, headers=HEADERS, timeout=IMAGE_TIMEOUT)
+            response.raise_for_status()
+            data = self._encode(response.content)
+        except (requests.exceptions.RequestException, OSError, ValueError) as e:
+            print(f"Thumbnail for {url} failed: {e}")
+            return url, False
+        # Write then rename so concurrent sessions never read a partial file
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path, True
+
+    def _encode(self, content):
+        from PIL import Image
+
+        with Image.open(io.BytesIO(content)) as image:
+            image.draft("RGB", self.size)  # lets JPEG decode at reduced scale
+            image = image.convert("RGB")
+            image.thumbnail(self.size)
+            out = io.BytesIO()
+            image.save(out, format=self.image_format, quality=self.quality)
+            return out.getvalue()
+
+    def _evict(self):
+        with self._evict_lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+def get_thumbnail_cache():
+    """Process-wide ThumbnailCache."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ThumbnailCache()
+    return _shared_cache
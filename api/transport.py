@@ -0,0 +1,213 @@
+import os
+import gzip
+import json
+import time
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.structures import CaseInsensitiveDict
+from api.cache import cache_key
+from utils import metrics
+
+# live | record | replay | fallback, see make_transport()
+TRANSPORT_MODE = os.getenv("NASA_TRANSPORT", "live")
+ARCHIVE_DIR = os.getenv("NASA_ARCHIVE_DIR") or os.path.join(os.getenv("NASA_CACHE_DIR", ".cache"), "recordings")
+REPLAY_LATENCY_MS = float(os.getenv("NASA_REPLAY_LATENCY_MS", "0"))
+BREAKER_FAILURES = int(os.getenv("NASA_BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("NASA_BREAKER_RESET_SECONDS", "60"))
+
+# Response headers worth keeping in a recording
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class ResponseArchive:
+    """
+    Gzipped recordings of successful responses, one file per endpoint path
+    and params (the host and api_key are left out, so recordings made
+    against api.nasa.gov replay against any base URL).
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+
+    def path_for(self, url, params):
+        key = cache_key(urlsplit(url).path, params)
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def save(self, url, params, response):
+        path = self.path_for(url, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            "path": urlsplit(url).path,
+            "params": {k: v for k, v in (params or {}).items() if k != "api_key"},
+            "status": response.status_code,
+            "headers": {k: response.headers[k] for k in RECORDED_HEADERS if k in response.headers},
+            "body": response.content.decode(response.encoding or "utf-8"),
+            "recorded_at": time.time(),
+        }
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, path)
+
+    def load(self, url, params):
+        """The recorded response as a requests.Response, or None."""
+        try:
+            with gzip.open(self.path_for(url, params), "rt", encoding="utf-8") as f:
+                record = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response._content = record["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+
+def _describe(url, params):
+    """url path and params for error messages, without the api_key."""
+    return f"{urlsplit(url).path} {({k: v for k, v in (params or {}).items() if k != 'api_key'})}"
+
+
+class LiveTransport:
+    """Plain HTTP through the client's pooled, retrying session."""
+    mode = "live"
+
+    def __init__(self, session):
+        self.session = session
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+
+class RecordTransport(LiveTransport):
+    """Live HTTP that also saves every 200 response to the archive."""
+    mode = "record"
+
+    def __init__(self, session, archive):
+        super().__init__(session)
+        self.archive = archive
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = super().get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            self.archive.save(url, params, response)
+        return response
+
+
+class ReplayTransport:
+    """
+    Serves recordings with no network access, optionally after latency_ms.
+    A request with no recording raises ConnectionError, so the client falls
+    back exactly as it would for an unreachable upstream.
+    """
+    mode = "replay"
+
+    def __init__(self, archive, latency_ms=REPLAY_LATENCY_MS):
+        self.archive = archive
+        self.latency_ms = latency_ms
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        response = self.archive.load(url, params)
+        if response is None:
+            metrics.inc("nasa_transport_total", mode=self.mode, source="missing")
+            raise requests.exceptions.ConnectionError(f"No recording for {_describe(url, params)}")
+        metrics.inc("nasa_transport_total", mode=self.mode, source="archive")
+        return response
+
+
+class FallbackTransport(RecordTransport):
+    """
+    Live HTTP (recording as it goes) behind a circuit breaker.
+
+    After `failures` consecutive upstream failures (connection errors,
+    timeouts or 5xx) the breaker opens and requests are answered from the
+    archive immediately instead of waiting out timeouts and retries. After
+    `reset_seconds` one request is let through to probe the upstream; success
+    closes the breaker again. A failed live request is answered from the
+    archive too when a recording exists.
+    """
+    mode = "fallback"
+
+    def __init__(self, session, archive, failures=BREAKER_FAILURES, reset_seconds=BREAKER_RESET_SECONDS):
+        super().__init__(session, archive)
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_seconds else "open"
+
+    def _allow_live(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_seconds:
+                # Half-open: exactly one caller probes the upstream
+                self._probing = True
+                return True
+            return False
+
+    def _record_result(self, ok):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._consecutive_failures = 0
+                self._opened_at = None
+                return
+            self._consecutive_failures += 1
+            if self._opened_at is not None or self._consecutive_failures >= self.failures:
+                if self._opened_at is None:
+                    print(f"NASA API circuit breaker opened after {self._consecutive_failures} failures")
+                self._opened_at = time.monotonic()
+
+    def _from_archive(self, url, params, error):
+        response = self.archive.load(url, params)
+        if response is None:
+            metrics.inc("nasa_transport_total", mode=self.mode, source="missing")
+            raise error
+        metrics.inc("nasa_transport_total", mode=self.mode, source="archive")
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if not self._allow_live():
+            return self._from_archive(url, params, requests.exceptions.ConnectionError(
+                f"Circuit open and no recording for {_describe(url, params)}"))
+        try:
+            response = super().get(url, params=params, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            self._record_result(False)
+            return self._from_archive(url, params, e)
+        if response.status_code >= 500:
+            self._record_result(False)
+            return self._from_archive(url, params, requests.exceptions.HTTPError(
+                f"{response.status_code} from {url}", response=response))
+        self._record_result(True)
+        metrics.inc("nasa_transport_total", mode=self.mode, source="live")
+        return response
+
+
+def make_transport(session, mode=None, archive_dir=None):
+    """Transport for NASAClient: mode defaults to $NASA_TRANSPORT, the archive to $NASA_ARCHIVE_DIR."""
+    mode = (mode or TRANSPORT_MODE).lower()
+    if mode == "live":
+        return LiveTransport(session)
+    archive = ResponseArchive(archive_dir or ARCHIVE_DIR)
+    if mode == "record":
+        return RecordTransport(session, archive)
+    if mode == "replay":
+        return ReplayTransport(archive)
+    if mode == "fallback":
+        return FallbackTransport(session, archive)
+    raise ValueError(f"Unknown NASA_TRANSPORT mode {mode!r} (live, record, replay or fallback)")
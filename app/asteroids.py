@@ -1,67 +1,64 @@
 import streamlit as st
-from api.nasa_client import NASAClient
+from api.neo_store import get_neo_store
+from api.neo import hazardous_neos
 from visualization.charts import plot_neo_scatter
+from utils.memo import memoize
 import datetime
 
+# Store queries only change when a sync writes (from this or another process), so reruns reuse them
+@memoize(maxsize=16, key=lambda store, start_date, end_date: (store.path, store.version(), start_date, end_date))
+def stored_approaches(store, start_date, end_date):
+    return store.approaches(start_date, end_date)
+
+@memoize(maxsize=4, key=lambda store: (store.path, store.version()))
+def stored_history(store):
+    return store.closest_approaches(limit=10), store.fastest_hazardous(limit=10), store.monthly_counts()
+
 def app():
     st.header("Asteroid Watch ☄️")
     st.write("Monitoring Near Earth Objects (NEOs) - closest approach today.")
 
-    client = NASAClient()
-    
+    store = get_neo_store()
+
     col1, col2 = st.columns(2)
     with col1:
         start_date = st.date_input("Start Date", datetime.date.today())
     with col2:
         end_date = st.date_input("End Date", datetime.date.today())
-    
+
     if st.button("Scan Sky"):
         with st.spinner("Scanning for asteroids..."):
-            # Convert to string
-            s_str = start_date.strftime("%Y-%m-%d")
-            e_str = end_date.strftime("%Y-%m-%d")
-            
-            data = client.get_neo_feed(s_str, e_str)
-            
-            if data and "near_earth_objects" in data:
-                # Flatten data for visualization
-                neo_list = []
-                count = data.get("element_count", 0)
-                st.metric("Asteroids Detected", count)
-                
-                for date_key in data["near_earth_objects"]:
-                    for obj in data["near_earth_objects"][date_key]:
-                        # Extract relevant fields
-                        name = obj["name"]
-                        diameter = obj["estimated_diameter"]["kilometers"]["estimated_diameter_min"]
-                        is_hazardous = obj["is_potentially_hazardous_asteroid"]
-                        
-                        # Close approach data (take the first one usually)
-                        if obj["close_approach_data"]:
-                            cad = obj["close_approach_data"][0]
-                            miss_dist = float(cad["miss_distance"]["kilometers"])
-                            velocity = float(cad["relative_velocity"]["kilometers_per_hour"])
-                            
-                            neo_list.append({
-                                "name": name,
-                                "diameter_min_km": diameter,
-                                "hazardous": is_hazardous,
-                                "miss_distance_km": miss_dist,
-                                "velocity_kph": velocity,
-                                "close_approach_date": cad["close_approach_date_full"]
-                            })
-                
-                # Visualize
-                if neo_list:
-                    st.plotly_chart(plot_neo_scatter(neo_list), use_column_width=True)
-                    
-                    st.subheader("Hazardous Asteroids Detected")
-                    hazardous = [n for n in neo_list if n["hazardous"]]
-                    if hazardous:
-                        st.dataframe(hazardous)
-                    else:
-                        st.success("No hazardous asteroids in this range!")
-                else:
-                    st.warning("No approach data found.")
-            else:
-                st.error("Failed to fetch NEO data.")
+            # Only days not already stored locally are fetched
+            result = store.sync(start_date, end_date)
+            for failed in result["errors"]:
+                st.warning(f"Could not fetch {failed['start_date']} to {failed['end_date']}: {failed['error']}")
+
+    neo_df = stored_approaches(store, start_date, end_date)
+    if neo_df.empty:
+        if store.missing_days(start_date, end_date):
+            st.info("Press Scan Sky to fetch approaches for this range.")
+        else:
+            st.warning("No approach data found.")
+    else:
+        st.metric("Asteroids Detected", neo_df["id"].nunique())
+
+        # Visualize
+        st.plotly_chart(plot_neo_scatter(neo_df), use_column_width=True)
+
+        st.subheader("Hazardous Asteroids Detected")
+        hazardous = hazardous_neos(neo_df)
+        if not hazardous.empty:
+            st.dataframe(hazardous)
+        else:
+            st.success("No hazardous asteroids in this range!")
+
+    stored = store.stored_range()
+    if stored:
+        with st.expander(f"Stored history ({stored[0]} to {stored[1]})"):
+            closest, fastest, monthly = stored_history(store)
+            st.write("Closest approaches")
+            st.dataframe(closest)
+            st.write("Fastest hazardous objects")
+            st.dataframe(fastest)
+            st.write("Approaches per month")
+            st.bar_chart(monthly.set_index("month")[["approaches", "hazardous_approaches"]])
@@ -0,0 +1,58 @@
+import streamlit as st
+import pandas as pd
+from utils import metrics
+
+def app():
+    st.header("Diagnostics 🩺")
+    
+    if not metrics.ENABLED:
+        st.info("Metrics are off. Start the dashboard with ASTROINTEL_METRICS=1 to collect them.")
+        return
+    
+    snapshot = metrics.snapshot()
+    counters, histograms = snapshot["counters"], snapshot["histograms"]
+    
+    st.subheader("NASA API by endpoint")
+    endpoints = {}
+    for counter in counters:
+        endpoint = counter["labels"].get("endpoint")
+        if endpoint is None or not counter["name"].startswith("nasa_"):
+            continue
+        row = endpoints.setdefault(endpoint, {"endpoint": endpoint})
+        column = counter["name"].replace("nasa_", "").replace("_total", "")
+        if counter["name"] in ("nasa_cache_total", "nasa_responses_total"):
+            column = f"{column} {counter['labels'].get('result', counter['labels'].get('status'))}"
+        row[column] = row.get(column, 0) + counter["value"]
+    for histogram in histograms:
+        if histogram["name"] == "nasa_request_ms":
+            row = endpoints.setdefault(histogram["labels"]["endpoint"], {"endpoint": histogram["labels"]["endpoint"]})
+            row["p50 ms"], row["p95 ms"] = histogram["p50_ms"], histogram["p95_ms"]
+    if endpoints:
+        st.dataframe(pd.DataFrame(list(endpoints.values())).fillna(0), hide_index=True)
+    else:
+        st.write("No API calls yet.")
+    
+    st.subheader("Latency")
+    if histograms:
+        st.dataframe(pd.DataFrame([
+            {"metric": h["name"], "labels": ", ".join(f"{k}={v}" for k, v in h["labels"].items()),
+             "count": h["count"], "mean ms": h["mean_ms"], "p50 ms": h["p50_ms"],
+             "p95 ms": h["p95_ms"], "p99 ms": h["p99_ms"]}
+            for h in histograms
+        ]), hide_index=True)
+    
+    st.subheader("Counters")
+    if counters:
+        st.dataframe(pd.DataFrame([
+            {"metric": c["name"], "labels": ", ".join(f"{k}={v}" for k, v in c["labels"].items()), "value": c["value"]}
+            for c in counters
+        ]), hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download Prometheus metrics", metrics.prometheus_text(),
+                           file_name="astrointel.prom", mime="text/plain")
+    with col2:
+        if st.button("Reset metrics"):
+            metrics.reset()
+            st.rerun()
@@ -1,11 +1,12 @@
 import streamlit as st
-from api.nasa_client import NASAClient
+from api.nasa_client import get_client, epic_image_url
+from api.thumbnails import get_thumbnail_cache
 
 def app():
     st.header("Earth Views (EPIC) 🌍")
     st.write("Earth Polychromatic Imaging Camera (DSCOV) - Daily Blue Marble.")
 
-    client = NASAClient()
+    client = get_client()
     
     # Date picker
     date = st.date_input("Select Date", None) # None implies latest
@@ -19,23 +20,13 @@ def app():
             if images:
                 st.success(f"Found {len(images)} images.")
                 
-                # Carousel or Grid
-                # For EPIC, we need to construct the image URL
-                # https://epic.gsfc.nasa.gov/archive/natural/2019/05/30/png/epic_1b_20190530011359.png
-                
-                for img in images:
-                    # Construct URL
-                    # Format of date in 'identifier' or 'date' field?
-                    # API returns 'date': '2023-10-10 00:00:00'
-                    img_date_str = img['date'].split(' ')[0]
-                    year, month, day = img_date_str.split('-')
-                    filename = img['image']
-                    
-                    # Url structure: https://epic.gsfc.nasa.gov/archive/natural/{year}/{month}/{day}/png/{filename}.png
-                    image_url = f"https://epic.gsfc.nasa.gov/archive/natural/{year}/{month}/{day}/png/{filename}.png"
-                    
-                    st.image(image_url, caption=f"{img['date']} - {img['caption']}", use_column_width=True)
-                    st.divider()
+                # Small EPIC previews, downscaled and cached locally; originals on demand
+                thumbs = get_thumbnail_cache().thumbnails([epic_image_url(img, "thumbs") for img in images])
+                cols = st.columns(3)
+                for idx, (img, thumb) in enumerate(zip(images, thumbs)):
+                    with cols[idx % 3]:
+                        st.image(thumb, caption=f"{img['date']} - {img['caption']}", use_column_width=True)
+                        st.markdown(f"[Full size (PNG)]({epic_image_url(img, 'png')})")
 
             else:
                 st.warning("No images found for this date. (EPIC data has a lag of 1-2 days usually).")
@@ -1,5 +1,9 @@
+import itertools
 import streamlit as st
-from api.nasa_client import NASAClient
+from api.nasa_client import get_client
+from api.thumbnails import get_thumbnail_cache
+
+PAGE_SIZE = 20
 
 def app():
     st.header("NASA Image Gallery 🖼️")
@@ -7,27 +11,42 @@ def app():
     query = st.text_input("Search NASA's Library", "Black Hole")
     
     if st.button("Search"):
-        client = NASAClient()
-        with st.spinner("Searching..."):
-            results = client.search_images(query)
-            
-            if results and "collection" in results:
-                items = results["collection"]["items"]
-                st.success(f"Found {len(items)} results.")
-                
-                for item in items[:20]: # Limit to 20
-                    data = item["data"][0]
-                    links = item.get("links", [])
-                    
-                    if links:
-                        img_url = links[0]["href"]
-                        title = data.get("title", "No Title")
-                        desc = data.get("description", "No description.")
-                        
-                        st.subheader(title)
-                        st.image(img_url, use_column_width=True)
-                        with st.expander("Description"):
-                            st.write(desc)
-                        st.divider()
-            else:
-                st.error("Search failed.")
+        # Keep the lazy result stream across reruns so "Load more" continues it
+        st.session_state.gallery = {
+            "query": query,
+            "results": get_client().iter_search(query),
+            "items": [],
+            "exhausted": False,
+        }
+        load_more()
+    
+    gallery = st.session_state.get("gallery")
+    if not gallery:
+        return
+    
+    if not gallery["items"]:
+        st.warning("No results found.")
+        return
+    
+    st.success(f"Showing {len(gallery['items'])} results for \"{gallery['query']}\".")
+    
+    items = [item for item in gallery["items"] if item["thumb"]]
+    thumbs = get_thumbnail_cache().thumbnails([item["thumb"] for item in items])
+    for item, thumb in zip(items, thumbs):
+        st.subheader(item["title"])
+        st.image(thumb, use_column_width=True)
+        st.markdown(f"[Full size]({item['full']})")
+        with st.expander("Description"):
+            st.write(item["description"])
+        st.divider()
+    
+    if not gallery["exhausted"] and st.button("Load more"):
+        load_more()
+        st.rerun()
+
+def load_more():
+    gallery = st.session_state.gallery
+    with st.spinner("Searching..."):
+        batch = list(itertools.islice(gallery["results"], PAGE_SIZE))
+    gallery["items"].extend(batch)
+    gallery["exhausted"] = len(batch) < PAGE_SIZE
@@ -1,16 +1,24 @@
 import streamlit as st
-import pandas as pd
-from api.nasa_client import NASAClient
+from concurrent.futures import ThreadPoolExecutor
+from api.nasa_client import get_client
 
 def app():
     st.title("Welcome to AstroIntel 🌌")
     st.markdown("### Artificial Intelligence for Space Analytics")
     
-    client = NASAClient()
+    client = get_client()
+    
+    # Issued together, so the page waits for the slowest call rather than the sum;
+    # going through the shared client keeps coalescing, stale-while-revalidate and metrics
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        apod = pool.submit(client.get_apod)
+        neo = pool.submit(client.get_neo_feed)
+        epic = pool.submit(client.get_epic_images)
+        results = {"apod": apod.result(), "neo": neo.result(), "epic": epic.result()}
     
     # APOD Section
     st.subheader("Astronomy Picture of the Day")
-    apod_data = client.get_apod()
+    apod_data = results["apod"]
     
     if apod_data:
         if apod_data.get("media_type") == "image":
@@ -26,5 +34,15 @@ def app():
         if st.button("Retry Load APOD"):
             st.rerun()
 
+    st.markdown("---")
+    st.subheader("Today at a Glance")
+    neo_today = [obj for objects in (results["neo"] or {}).get("near_earth_objects", {}).values() for obj in objects]
+    epic_images = results["epic"] or []
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Asteroids Passing Today", len(neo_today))
+    col2.metric("Potentially Hazardous", sum(bool(obj.get("is_potentially_hazardous_asteroid")) for obj in neo_today))
+    col3.metric("Latest EPIC Earth Images", len(epic_images),
+                help=f"Taken {epic_images[0].get('date', '')[:10]}" if epic_images else None)
+    
     st.markdown("---")
     st.info("👈 Use the sidebar to navigate between modules.")
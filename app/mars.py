@@ -1,16 +1,34 @@
 import streamlit as st
-from api.nasa_client import NASAClient
+from api.nasa_client import get_client
+from api.rover_index import get_rover_index
+from api.thumbnails import get_thumbnail_cache
 from ml.predictor import MarsPredictor
-from visualization.charts import plot_temp_predictions
-import pandas as pd
-import os
+from ml.history import get_history
+from visualization.charts import plot_temp_predictions, plot_season_heatmap
+from utils.memo import memoize
+import numpy as np
+
+# Keyed by model / history version, so slider reruns with unchanged inputs skip the work
+@memoize(maxsize=8, key=lambda predictor, wind: (predictor.surface.meta.get('model_version'), wind))
+def season_heatmap(predictor, wind):
+    ls_axis = predictor.surface.axis_values('ls')
+    press_axis = predictor.surface.axis_values('pressure')
+    grid_ls, grid_press = np.meshgrid(ls_axis, press_axis, indexing='ij')
+    temps = predictor.predict_batch(np.column_stack([
+        grid_ls.ravel(), grid_press.ravel(), np.full(grid_ls.size, wind)
+    ])).reshape(grid_ls.shape)
+    return plot_season_heatmap(ls_axis, press_axis, temps, wind)
+
+@memoize(maxsize=8, key=lambda history, station, sols, pred: (history.source, history.version, station, sols, pred))
+def history_chart(history, station, sols, pred):
+    return plot_temp_predictions(history.frame(['sol', 'avg_temp'], sols=sols, station=station), pred)
 
 def app():
     st.header("Mars Exploration 🔴")
     
     tab1, tab2 = st.tabs(["Rover Photos", "Weather Prediction (AI)"])
     
-    client = NASAClient()
+    client = get_client()
 
     with tab1:
         st.subheader("Curiosity Rover Photos")
@@ -18,23 +36,44 @@ def app():
         cam = st.selectbox("Camera", ["FHAZ", "RHAZ", "MAST", "CHEMCAM", "MAHLI", "MARDI", "NAVCAM"])
         
         if st.button("Get Photos"):
-            photos_data = client.get_mars_rover_photos(sol=sol, rover="curiosity")
-            if photos_data and "photos" in photos_data:
-                photos = photos_data["photos"]
-                # Filter by camera
-                filtered_photos = [p for p in photos if p.get("camera", {}).get("name") == cam]
+            index = get_rover_index()
+            synced = index.sync("curiosity", [sol], client=client)
+            if sol in synced["synced"] or not synced["errors"]:
+                # Answered from the local index; the sol's manifest is only downloaded once
+                filtered_photos = index.photos("curiosity", sol=sol, camera=cam, limit=9)
+                total = index.count("curiosity", sol, camera=cam)
+            else:
+                # Index unavailable for this sol: ask upstream for just this camera
+                photos_data = client.get_mars_rover_photos(sol=sol, rover="curiosity", camera=cam)
+                filtered_photos = photos_data.get("photos", []) if photos_data else []
+                total = len(filtered_photos)
                 
-                if filtered_photos:
-                    st.success(f"Found {len(filtered_photos)} photos.")
-                    # Show first 5
-                    cols = st.columns(3)
-                    for idx, photo in enumerate(filtered_photos[:9]):
-                        with cols[idx % 3]:
-                            st.image(photo['img_src'], caption=f"{photo['rover']['name']} - {photo['camera']['full_name']}", use_column_width=True)
-                else:
-                    st.warning(f"No photos found for {cam} on Sol {sol}.")
+            if filtered_photos:
+                st.success(f"Found {total} photos.")
+                # Show first 9, as cached thumbnails linking to the originals
+                shown = filtered_photos[:9]
+                thumbs = get_thumbnail_cache().thumbnails([photo['img_src'] for photo in shown])
+                cols = st.columns(3)
+                for idx, (photo, thumb) in enumerate(zip(shown, thumbs)):
+                    with cols[idx % 3]:
+                        st.image(thumb, caption=f"{photo['rover']['name']} - {photo['camera']['full_name']}", use_column_width=True)
+                        st.markdown(f"[Full size]({photo['img_src']})")
             else:
-                st.error("Failed to fetch rover data.")
+                st.warning(f"No photos found for {cam} on Sol {sol}.")
+        
+        with st.expander(f"Find sols with {cam} images"):
+            sol_range = st.slider("Sol range", 1, 3000, (max(1, sol - 30), sol))
+            if st.button("Search Sols"):
+                index = get_rover_index()
+                with st.spinner("Indexing sols..."):
+                    synced = index.sync("curiosity", range(sol_range[0], sol_range[1] + 1), client=client)
+                if synced["errors"]:
+                    st.warning(f"{len(synced['errors'])} sols could not be indexed and were skipped.")
+                matches = index.sols_with_camera("curiosity", cam, *sol_range)
+                if matches:
+                    st.dataframe([{"sol": s, "photos": n} for s, n in matches])
+                else:
+                    st.info(f"No {cam} images in sols {sol_range[0]}-{sol_range[1]}.")
 
     with tab2:
         st.subheader("Mars Weather Prediction (ML)")
@@ -48,17 +87,36 @@ def app():
         with col3:
             wind_input = st.slider("Wind Speed (m/s)", 0.0, 20.0, 5.0)
             
+        # With a precomputed surface, predictions are cheap enough to follow the sliders
+        predictor = MarsPredictor(mode='lookup')
+        live = bool(predictor.model) and predictor.surface is not None
+        if live:
+            pred_temp = predictor.predict(ls_input, press_input, wind_input)
+            st.metric("Predicted Temperature", f"{pred_temp:.2f} °C")
+            st.caption(f"Interpolated from a precomputed grid (max error ±{predictor.max_interpolation_error:.2f} °C).")
+            
+            if st.checkbox("Show seasonal heatmap"):
+                st.plotly_chart(season_heatmap(predictor, wind_input), use_container_width=True)
+            
+        history = get_history()
+        history_sols = history.sol_bounds(history.default_station) if history is not None else None
+        if history_sols and history_sols[0] < history_sols[1]:
+            # The chart is downsampled to its width; a narrower range shows every sol
+            sol_window = st.slider("History sols to chart", history_sols[0], history_sols[1], history_sols)
+        else:
+            sol_window = history_sols
+            
         if st.button("Predict Temperature"):
-            predictor = MarsPredictor()
             if predictor.model:
                 pred_temp = predictor.predict(ls_input, press_input, wind_input)
-                st.metric("Predicted Temperature", f"{pred_temp:.2f} °C")
+                if not live:
+                    st.metric("Predicted Temperature", f"{pred_temp:.2f} °C")
                 
                 # Show context on historical chart
-                # Load history
-                if os.path.exists('data/mars_weather_synthetic.csv'):
-                    hist_df = pd.read_csv('data/mars_weather_synthetic.csv')
-                    fig = plot_temp_predictions(hist_df, pred_temp)
+                if history is not None:
+                    fig = history_chart(history, history.default_station, sol_window, pred_temp)
                     st.plotly_chart(fig, use_container_width=True)
+                    with st.expander("Seasonal averages"):
+                        st.dataframe(history.season_stats())
             else:
                 st.error("Model not found. Please ensure training is complete.")
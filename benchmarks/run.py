@@ -0,0 +1,333 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from benchmarks.stub_server import StubNASAServer, neo_object, _seeded
+
+RESULTS_DIR = 'benchmarks/results'
+# Metrics where a larger number is better; every other metric is a time or a size
+HIGHER_IS_BETTER = ('rps', 'rows_per_s', 'objects_per_s')
+
+
+def _percentiles(timings):
+    timings = np.asarray(timings) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(timings, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings, 95)), 3),
+        'p99_ms': round(float(np.percentile(timings, 99)), 3),
+    }
+
+
+def _best_of(fn, repeats=3):
+    """Fastest of `repeats` runs of fn() in ms, and fn's last result."""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3), result
+
+
+def bench_client(args):
+    """Throughput and tail latency of NASAClient and AsyncNASAClient against the stand-in server."""
+    import requests
+    from api.nasa_client import NASAClient
+    from api.cache import ResponseCache
+
+    results = {}
+    with StubNASAServer(latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate) as server:
+        day = datetime.date(2024, 1, 1)
+
+        def call(client, i):
+            # Distinct parameters per call so single-flight doesn't merge them
+            kind = i % 4
+            if kind == 0:
+                return client._fetch(f"{server.base_url}/mars-photos/api/v1/rovers/curiosity/photos", {"sol": i})
+            if kind == 1:
+                date = (day + datetime.timedelta(days=i)).isoformat()
+                return client._fetch(f"{server.base_url}/neo/rest/v1/feed", {"start_date": date, "end_date": date})
+            if kind == 2:
+                date = (day + datetime.timedelta(days=i)).isoformat()
+                return client._fetch(f"{server.base_url}/EPIC/api/natural/date/{date}")
+            return client._fetch(f"{server.images_url}/search", {"q": f"nebula {i}", "media_type": "image"})
+
+        for concurrency in args.concurrency:
+            client = NASAClient(cache=False, base_url=server.base_url, images_url=server.images_url,
+                                pool_maxsize=max(concurrency, 1))
+            timings, errors = [], 0
+
+            def timed(i):
+                start = time.perf_counter()
+                try:
+                    call(client, i)
+                    ok = True
+                except requests.exceptions.RequestException:
+                    ok = False
+                return time.perf_counter() - start, ok
+
+            sent_before = server.bytes_sent
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for elapsed, ok in pool.map(timed, range(args.requests)):
+                    timings.append(elapsed)
+                    errors += not ok
+            wall = time.perf_counter() - start
+            results[f'concurrency_{concurrency}'] = {
+                'rps': round(args.requests / wall, 1),
+                **_percentiles(timings),
+                'errors': errors,
+                'mb_received': round((server.bytes_sent - sent_before) / 1e6, 2),
+            }
+
+        # Same mix through AsyncNASAClient on one event loop
+        import asyncio
+        import aiohttp
+        from api.async_client import AsyncNASAClient
+
+        async def call_async(client, i):
+            kind = i % 4
+            if kind == 0:
+                return await client._fetch(f"{server.base_url}/mars-photos/api/v1/rovers/curiosity/photos", {"sol": i})
+            if kind == 1:
+                date = (day + datetime.timedelta(days=i)).isoformat()
+                return await client._fetch(f"{server.base_url}/neo/rest/v1/feed", {"start_date": date, "end_date": date})
+            if kind == 2:
+                date = (day + datetime.timedelta(days=i)).isoformat()
+                return await client._fetch(f"{server.base_url}/EPIC/api/natural/date/{date}")
+            return await client._fetch(f"{server.images_url}/search", {"q": f"nebula {i}", "media_type": "image"})
+
+        async def run_async(concurrency):
+            async with AsyncNASAClient(concurrency=concurrency, limit_per_host=concurrency, cache=False,
+                                       base_url=server.base_url, images_url=server.images_url) as client:
+                async def timed_async(i):
+                    start = time.perf_counter()
+                    try:
+                        await call_async(client, i)
+                        ok = True
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        ok = False
+                    return time.perf_counter() - start, ok
+                return await asyncio.gather(*(timed_async(i) for i in range(args.requests)))
+
+        for concurrency in args.concurrency:
+            sent_before = server.bytes_sent
+            start = time.perf_counter()
+            outcomes = asyncio.run(run_async(max(concurrency, 1)))
+            wall = time.perf_counter() - start
+            # Timings include the wait for a semaphore slot, unlike the thread pool case
+            results[f'async_concurrency_{concurrency}'] = {
+                'rps': round(args.requests / wall, 1),
+                **_percentiles([elapsed for elapsed, _ in outcomes]),
+                'errors': sum(not ok for _, ok in outcomes),
+                'mb_received': round((server.bytes_sent - sent_before) / 1e6, 2),
+            }
+
+        # Same calls answered from a warm response cache
+        cache_dir = tempfile.mkdtemp(prefix='astrointel-bench-')
+        try:
+            client = NASAClient(cache=ResponseCache(os.path.join(cache_dir, 'cache.sqlite')),
+                                base_url=server.base_url, images_url=server.images_url)
+            keys = range(min(args.requests, 200))
+            for i in keys:
+                call(client, i)
+            timings = []
+            start = time.perf_counter()
+            for i in keys:
+                t = time.perf_counter()
+                call(client, i)
+                timings.append(time.perf_counter() - t)
+            results['cached'] = {'rps': round(len(keys) / (time.perf_counter() - start), 1), **_percentiles(timings)}
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def bench_neo(args):
+    """flatten_neo_feed time against the number of objects in the feed."""
+    from api.neo import flatten_neo_feed
+
+    results = {}
+    per_day = 20
+    for count in args.neo_objects:
+        feed = {"near_earth_objects": {}}
+        day = datetime.date(2024, 1, 1)
+        for d in range(-(-count // per_day)):
+            date = day + datetime.timedelta(days=d)
+            rng = _seeded(0, 'bench', date)
+            n = min(per_day, count - d * per_day)
+            feed["near_earth_objects"][date.isoformat()] = [neo_object(rng, date, i) for i in range(n)]
+        ms, df = _best_of(lambda: flatten_neo_feed(feed))
+        results[f'objects_{count}'] = {'ms': ms, 'objects_per_s': round(count / (ms / 1000), 1), 'rows': len(df)}
+    return results
+
+
+def bench_predictor(args):
+    """Model load time, per-row latency and batch throughput of MarsPredictor."""
+    import ml.predictor as predictor_module
+    from ml.predictor import MarsPredictor, MODEL_PATH
+
+    if not os.path.exists(MODEL_PATH):
+        return {'skipped': f'{MODEL_PATH} not found; run python -m ml.train_model'}
+
+    rng = np.random.default_rng(0)
+    rows = rng.uniform([0, 600, 0], [360, 1200, 20], size=(args.predict_rows, 3))
+    batch = rng.uniform([0, 600, 0], [360, 1200, 20], size=(10_000, 3))
+    results = {}
+    for name, kwargs in (('flat', {'engine': 'flat'}), ('sklearn', {'engine': 'sklearn'}),
+                         ('auto', {}), ('lookup', {'mode': 'lookup'})):
+        predictor_module._model_cache.clear()
+        start = time.perf_counter()
+        predictor = MarsPredictor(**kwargs)
+        load_ms = round((time.perf_counter() - start) * 1000, 3)
+        if not predictor.model:
+            results[name] = {'skipped': 'model could not be loaded'}
+            continue
+        predictor.predict(*rows[0])  # warm-up
+        timings = []
+        for row in rows:
+            start = time.perf_counter()
+            predictor.predict(*row)
+            timings.append(time.perf_counter() - start)
+        batch_ms, _ = _best_of(lambda: predictor.predict_batch(batch))
+        results[name] = {'load_ms': load_ms, **_percentiles(timings), 'batch_10000_ms': batch_ms,
+                         'rows_per_s': round(10_000 / (batch_ms / 1000), 1)}
+    return results
+
+
+def bench_charts(args):
+    """Figure build time and serialised size against point count."""
+    import pandas as pd
+    from visualization.charts import plot_temp_predictions, plot_neo_scatter
+
+    results = {}
+    rng = np.random.default_rng(0)
+    for points in args.chart_points:
+        sol = np.arange(points)
+        df = pd.DataFrame({'sol': sol, 'avg_temp': -35 + 20 * np.sin(sol / 106) + rng.normal(0, 2, points)})
+        ms, fig = _best_of(lambda: plot_temp_predictions(df, -40.0))
+        results[f'temp_line_{points}'] = {'ms': ms, 'json_bytes': len(fig.to_json())}
+
+    # Bypass the memo so every run builds the figure
+    build_scatter = plot_neo_scatter.__wrapped__
+    for points in args.chart_points:
+        if points > 100_000:
+            continue
+        df = pd.DataFrame({
+            'miss_distance_km': rng.uniform(1e5, 7.5e7, points),
+            'velocity_kph': rng.uniform(5e3, 1.5e5, points),
+            'diameter_min_km': rng.uniform(0.005, 2, points),
+            'hazardous': rng.random(points) < 0.1,
+            'name': [f'neo {i}' for i in range(points)],
+            'close_approach_date': '2024-Jan-01 00:00',
+        })
+        ms, fig = _best_of(lambda: build_scatter(df))
+        results[f'neo_scatter_{points}'] = {'ms': ms, 'json_bytes': len(fig.to_json())}
+    return results
+
+
+SUITES = {'client': bench_client, 'neo': bench_neo, 'predictor': bench_predictor, 'charts': bench_charts}
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for name, value in results.items():
+        path = f'{prefix}{name}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(current, baseline, threshold):
+    """Print metric changes against a baseline; returns the regressed metric paths."""
+    now, before = flatten(current['results']), flatten(baseline['results'])
+    regressions = []
+    print(f"{'metric':<50} {'baseline':>12} {'current':>12} {'change':>8}")
+    for path in sorted(now.keys() & before.keys()):
+        old, new = before[path], now[path]
+        if path.endswith('errors') or path.endswith('rows') or old == 0:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if path.rsplit('.', 1)[-1] in HIGHER_IS_BETTER else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESSION'
+            regressions.append(path)
+        elif worse < -threshold:
+            flag = '  improved'
+        print(f"{path:<50} {old:>12g} {new:>12g} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("suites", nargs="*", metavar="SUITE",
+                        help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--out", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stand-in server latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of 503s (note: retried with the client's real backoff)")
+    args = parser.parse_args()
+    unknown = sorted(set(args.suites) - set(SUITES))
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+    args.neo_objects = [100, 1_000, 10_000] if args.quick else [100, 1_000, 10_000, 50_000]
+    args.chart_points = [1_000, 100_000] if args.quick else [1_000, 10_000, 100_000, 1_000_000]
+    args.predict_rows = 200 if args.quick else 1_000
+    if args.quick:
+        args.requests = min(args.requests, 100)
+
+    report = {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('out', 'compare')},
+        },
+        'results': {},
+    }
+    for name in args.suites or list(SUITES):
+        print(f"Running {name} benchmarks...")
+        start = time.perf_counter()
+        report['results'][name] = SUITES[name](args)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
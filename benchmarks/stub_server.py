@@ -0,0 +1,259 @@
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CAMERAS = [("FHAZ", "Front Hazard Avoidance Camera"), ("RHAZ", "Rear Hazard Avoidance Camera"),
+           ("MAST", "Mast Camera"), ("CHEMCAM", "Chemistry and Camera Complex"),
+           ("MAHLI", "Mars Hand Lens Imager"), ("NAVCAM", "Navigation Camera")]
+
+
+def _seeded(seed, *parts):
+    return random.Random(f"{seed}|{'|'.join(map(str, parts))}")
+
+
+def apod(config, query):
+    return {
+        "date": query.get("date", datetime.date.today().isoformat()),
+        "title": "Benchmark Nebula",
+        "explanation": "Stand-in APOD payload. " * 40,
+        "media_type": "image",
+        "url": "https://apod.nasa.gov/apod/image/bench.jpg",
+        "hdurl": "https://apod.nasa.gov/apod/image/bench_hd.jpg",
+    }
+
+
+def neo_object(rng, day, index):
+    approach = datetime.datetime.combine(day, datetime.time(), datetime.timezone.utc) \
+        + datetime.timedelta(minutes=rng.randrange(24 * 60))
+    diameter = rng.uniform(0.005, 2.0)
+    return {
+        "id": f"{day:%Y%m%d}{index:04d}",
+        "neo_reference_id": f"{day:%Y%m%d}{index:04d}",
+        "name": f"({day.year} {chr(65 + index % 26)}{chr(65 + index // 26 % 26)}{index})",
+        "absolute_magnitude_h": rng.uniform(15, 30),
+        "estimated_diameter": {"kilometers": {"estimated_diameter_min": diameter,
+                                              "estimated_diameter_max": diameter * 2.236}},
+        "is_potentially_hazardous_asteroid": rng.random() < 0.1,
+        "close_approach_data": [{
+            "close_approach_date": day.isoformat(),
+            "close_approach_date_full": approach.strftime("%Y-%b-%d %H:%M"),
+            "epoch_date_close_approach": int(approach.timestamp() * 1000),
+            "relative_velocity": {"kilometers_per_second": "0", "kilometers_per_hour": f"{rng.uniform(5e3, 1.5e5):.6f}"},
+            "miss_distance": {"kilometers": f"{rng.uniform(1e5, 7.5e7):.6f}"},
+            "orbiting_body": "Earth",
+        }],
+        "is_sentry_object": False,
+    }
+
+
+def neo_feed(config, query):
+    start = datetime.date.fromisoformat(query.get("start_date", datetime.date.today().isoformat()))
+    end = datetime.date.fromisoformat(query.get("end_date", start.isoformat()))
+    objects = {}
+    day = start
+    while day <= end:
+        rng = _seeded(config.seed, "neo", day)
+        objects[day.isoformat()] = [neo_object(rng, day, i) for i in range(config.neo_per_day)]
+        day += datetime.timedelta(days=1)
+    return {"element_count": sum(len(v) for v in objects.values()), "near_earth_objects": objects}
+
+
+def epic(config, query, date=None):
+    date = date or "2024-01-01"
+    return [{
+        "identifier": f"{date.replace('-', '')}{i:06d}",
+        "caption": "This image was taken by NASA's EPIC camera onboard the NOAA DSCOVR spacecraft",
+        "image": f"epic_1b_{date.replace('-', '')}{i:06d}",
+        "date": f"{date} {i % 24:02d}:00:00",
+        "centroid_coordinates": {"lat": 0.0, "lon": 15.0 * i},
+    } for i in range(config.epic_images)]
+
+
+def rover_photos(config, query, rover):
+    sol = int(query.get("sol", 1000))
+    rng = _seeded(config.seed, "rover", rover, sol)
+    camera = query.get("camera", "").upper()
+    photos = []
+    for i in range(config.photos_per_sol):
+        name, full_name = CAMERAS[rng.randrange(len(CAMERAS))]
+        if camera and name != camera:
+            continue
+        photos.append({
+            "id": sol * 10_000 + i, "sol": sol,
+            "camera": {"id": CAMERAS.index((name, full_name)), "name": name, "rover_id": 5, "full_name": full_name},
+            "img_src": f"https://mars.nasa.gov/msl-raw-images/{sol}/{name}_{i}.JPG",
+            "earth_date": "2015-05-30",
+            "rover": {"id": 5, "name": rover.capitalize(), "status": "active"},
+        })
+    return {"photos": photos}
+
+
+def rover_manifest(config, query, rover):
+    max_sol = 4000
+    return {"photo_manifest": {
+        "name": rover.capitalize(), "status": "active", "max_sol": max_sol, "total_photos": max_sol * 100,
+        "photos": [{"sol": sol, "total_photos": 100, "cameras": [c for c, _ in CAMERAS]}
+                   for sol in range(max_sol - config.manifest_sols, max_sol + 1)],
+    }}
+
+
+def image_search(config, query, base):
+    page = int(query.get("page", 1))
+    items = [{
+        "href": f"{base}/asset/bench-{page}-{i}",
+        "data": [{"nasa_id": f"bench-{page}-{i}", "title": f"{query.get('q', '')} #{page}-{i}",
+                  "description": "Stand-in image library record. " * 10, "media_type": "image",
+                  "date_created": "2020-01-01T00:00:00Z", "center": "JPL"}],
+        "links": [{"href": f"https://images-assets.nasa.gov/image/bench-{page}-{i}/bench-{page}-{i}~thumb.jpg",
+                   "rel": "preview", "render": "image"},
+                  {"href": f"https://images-assets.nasa.gov/image/bench-{page}-{i}/bench-{page}-{i}~large.jpg",
+                   "rel": "alternate", "render": "image"},
+                  {"href": f"https://images-assets.nasa.gov/image/bench-{page}-{i}/bench-{page}-{i}~orig.jpg",
+                   "rel": "canonical", "render": "image"}],
+    } for i in range(config.search_items)]
+    links = []
+    if page < config.search_pages:
+        links.append({"rel": "next", "prompt": "Next",
+                      "href": f"{base}/search?q={query.get('q', '')}&media_type=image&page={page + 1}"})
+    return {"collection": {"version": "1.0", "href": base, "items": items, "links": links,
+                           "metadata": {"total_hits": config.search_items * config.search_pages}}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        config = self.server.config
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        path = parts.path
+        with self.server.lock:
+            self.server.request_count += 1
+
+        if config.latency_ms:
+            time.sleep(max(0.0, random.gauss(config.latency_ms, config.latency_jitter_ms)) / 1000)
+        if config.error_rate and random.random() < config.error_rate:
+            return self._send(503, {"error": "stand-in upstream failure"})
+
+        segments = path.strip("/").split("/")
+        if path == "/planetary/apod":
+            payload = apod(config, query)
+        elif path == "/neo/rest/v1/feed":
+            payload = neo_feed(config, query)
+        elif path.startswith("/EPIC/api/natural"):
+            payload = epic(config, query, segments[-1] if "date" in segments else None)
+        elif path.startswith("/mars-photos/api/v1/rovers/") and path.endswith("/photos"):
+            payload = rover_photos(config, query, segments[-2])
+        elif path.startswith("/mars-photos/api/v1/manifests/"):
+            payload = rover_manifest(config, query, segments[-1])
+        elif path == "/search":
+            payload = image_search(config, query, f"http://{self.headers.get('Host')}")
+        else:
+            return self._send(404, {"error": f"no stand-in for {path}"})
+        self._send(200, payload)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under benchmark concurrency
+    request_queue_size = 256
+
+
+class StubNASAServer:
+    """
+    Local stand-in for api.nasa.gov and images-api.nasa.gov serving seeded,
+    realistically shaped APOD/NEO/EPIC/rover/image-search payloads.
+
+    latency_ms/latency_jitter_ms add a Gaussian delay per request,
+    error_rate answers that fraction of requests with 503, and the
+    *_per_* / *_items options scale payload sizes. Point a client at it with
+    NASAClient(base_url=server.base_url, images_url=server.images_url).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, latency_jitter_ms=0.0, error_rate=0.0,
+                 neo_per_day=15, photos_per_sol=100, epic_images=12, manifest_sols=500,
+                 search_items=100, search_pages=3, seed=0):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.neo_per_day = neo_per_day
+        self.photos_per_sol = photos_per_sol
+        self.epic_images = epic_images
+        self.manifest_sols = manifest_sols
+        self.search_items = search_items
+        self.search_pages = search_pages
+        self.seed = seed
+        self._server = _Server((host, port), _Handler)
+        self._server.config = self
+        self._server.lock = threading.Lock()
+        self._server.request_count = 0
+        self._server.bytes_sent = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    images_url = base_url
+
+    @property
+    def request_count(self):
+        return self._server.request_count
+
+    @property
+    def bytes_sent(self):
+        return self._server.bytes_sent
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-nasa", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve stand-in NASA API payloads locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--neo-per-day", type=int, default=15)
+    parser.add_argument("--photos-per-sol", type=int, default=100)
+    args = parser.parse_args()
+
+    server = StubNASAServer(port=args.port, latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms,
+                            error_rate=args.error_rate, neo_per_day=args.neo_per_day,
+                            photos_per_sol=args.photos_per_sol)
+    print(f"Stand-in NASA API on {server.base_url}; pass it as NASAClient(base_url=..., images_url=...). Ctrl+C to stop")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,9 +1,14 @@
+import os
+import sys
+import time
+import importlib
 import streamlit as st
-import app.home
-import app.asteroids
-import app.earth
-import app.mars
-import app.gallery
+from api.prefetch import start_prefetcher
+from utils import metrics
+
+# Set ASTROINTEL_IMPORT_PROFILE=1 to report how long each page import takes
+IMPORT_PROFILE = os.getenv("ASTROINTEL_IMPORT_PROFILE") == "1"
+import_costs = {}
 
 # Page Config
 st.set_page_config(
@@ -40,38 +45,90 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def load_page(target):
+    """Resolve a page given as a callable or a "package.module:function" path.
+
+    Page modules (and the plotly/pandas/sklearn stacks behind them) are only
+    imported when the page is first shown.
+    """
+    if callable(target):
+        return target
+    module_name, _, attr = target.partition(":")
+    if module_name not in sys.modules and IMPORT_PROFILE:
+        before = set(sys.modules)
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        elapsed = time.perf_counter() - start
+        new_packages = sorted({name.split(".")[0] for name in set(sys.modules) - before
+                               if not name.startswith("_")})
+        import_costs[module_name] = (elapsed, new_packages)
+        print(f"Imported {module_name} in {elapsed * 1000:.0f} ms ({', '.join(new_packages)})")
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, attr or "app")
+
 class MultiApp:
     def __init__(self):
         self.apps = []
     
-    def add_app(self, title, func):
+    def add_app(self, title, func, hidden=False):
+        # func may be a callable or an import path like "app.home:app".
+        # Hidden pages stay out of the navigation and open with ?page=<title>
         self.apps.append({
             "title": title,
-            "function": func
+            "function": func,
+            "hidden": hidden
         })
         
     def run(self):
         with st.sidebar:
             st.title("AstroIntel 🚀")
             st.markdown("---")
+            # A hidden page requested via ?page= is shown with nothing selected;
+            # picking any page in the sidebar drops the query param again
+            requested = st.query_params.get("page", "").lower()
+            hidden = next((app for app in self.apps
+                           if app['hidden'] and app['title'].lower() == requested), None)
             app = st.radio(
                 "Navigation",
-                self.apps,
-                format_func=lambda app: app['title']
-            )
+                [app for app in self.apps if not app['hidden']],
+                index=None if hidden else 0,
+                format_func=lambda app: app['title'],
+                key="navigation",
+                on_change=lambda: st.query_params.pop("page", None)
+            ) or hidden
             st.markdown("---")
             st.info("Developed by AstroIntel AI")
             
-        app['function']()
+        with metrics.timer("page_import_ms", page=app['title']):
+            page = load_page(app['function'])
+        
+        if IMPORT_PROFILE and import_costs:
+            with st.sidebar.expander("Import profile"):
+                for module_name, (elapsed, packages) in import_costs.items():
+                    st.caption(f"{module_name}: {elapsed * 1000:.0f} ms — {', '.join(packages)}")
+        
+        with metrics.timer("page_render_ms", page=app['title']):
+            page()
+        if metrics.ENABLED:
+            # No-op unless ASTROINTEL_METRICS_FILE is set
+            metrics.write_prometheus()
 
 def main():
+    # Keeps APOD/NEO/EPIC/rover data warm in the shared client's cache
+    start_prefetcher()
+    if os.getenv("ASTROINTEL_METRICS_PORT"):
+        # Prometheus scrape endpoint at :<port>/metrics
+        metrics.start_http_server(int(os.getenv("ASTROINTEL_METRICS_PORT")))
+
     multi_app = MultiApp()
     
-    multi_app.add_app("Home", app.home.app)
-    multi_app.add_app("Asteroid Watch", app.asteroids.app)
-    multi_app.add_app("Earth Views", app.earth.app)
-    multi_app.add_app("Mars Exploration", app.mars.app)
-    multi_app.add_app("Image Gallery", app.gallery.app)
+    multi_app.add_app("Home", "app.home:app")
+    multi_app.add_app("Asteroid Watch", "app.asteroids:app")
+    multi_app.add_app("Earth Views", "app.earth:app")
+    multi_app.add_app("Mars Exploration", "app.mars:app")
+    multi_app.add_app("Image Gallery", "app.gallery:app")
+    multi_app.add_app("Diagnostics", "app.diagnostics:app", hidden=True)
     
     multi_app.run()
 
@@ -0,0 +1,165 @@
+import io
+import struct
+import zipfile
+import numpy as np
+
+# Bump when the array layout below changes
+FOREST_FORMAT_VERSION = 1
+
+# (row, tree) pairs above which FlatForest drops finished pairs as it goes
+COMPACT_MIN_PAIRS = 16384
+
+
+def export_forest(model, path):
+    """
+    Export a fitted sklearn RandomForestRegressor (or single tree) into flat
+    NumPy arrays saved as an uncompressed .npz:
+
+    - feature, threshold: split per node (leaves: feature 0, threshold +inf)
+    - left, right: global child indices (leaves point at themselves)
+    - value: leaf/node prediction
+    - roots: index of each tree's root node
+
+    Only attribute access is needed here, sklearn itself is not imported.
+    """
+    estimators = getattr(model, "estimators_", [model])
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        own = np.arange(offset, offset + n)
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        lefts.append(np.where(is_leaf, own, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own, tree.children_right + offset).astype(np.int32))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n
+
+    _save_aligned_npz(path, {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "meta": np.asarray([FOREST_FORMAT_VERSION, max_depth, model.n_features_in_], dtype=np.int64),
+    })
+
+
+def _save_aligned_npz(path, arrays, align=64):
+    """
+    Like np.savez, but pads each member's local header (via its extra field)
+    so array data starts on an `align`-byte boundary. Memory-mapped views of
+    unaligned members are valid but several times slower to index.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        for name, array in arrays.items():
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, np.ascontiguousarray(array))
+            info = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED
+            # .npy headers are already padded to 64 bytes; align the member start
+            data_start = archive.fp.tell() + 30 + len(info.filename.encode()) + 4
+            padding = -data_start % align
+            info.extra = struct.pack("<HH", 0xD935, padding) + b"\0" * padding
+            archive.writestr(info, buffer.getvalue())
+
+
+def _load_npz(path, mmap=True):
+    """
+    Load every array of an uncompressed .npz. With mmap=True each member is
+    memory-mapped in place (np.load ignores mmap_mode for .npz archives).
+    """
+    if not mmap:
+        with np.load(path) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {info.filename} is compressed, cannot memory-map")
+            # Local file header: 30 fixed bytes, then file name and extra field
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len = int.from_bytes(header[26:28], "little")
+            extra_len = int.from_bytes(header[28:30], "little")
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[info.filename[:-4]] = np.memmap(
+                path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+class FlatForest:
+    """
+    NumPy-only evaluator for forests written by export_forest.
+
+    Every (row, tree) pair descends one level per step; on large batches pairs
+    that reach a leaf drop out of the active set so deep trees don't cost
+    shallow ones.
+    Inputs are cast to float32 and per-tree predictions summed in tree order
+    before dividing, as sklearn does, so results match
+    RandomForestRegressor.predict bit for bit when sklearn predicts
+    single-threaded (n_jobs=None). With n_jobs > 1 sklearn's own summation
+    order varies and results agree to within ~1e-12 relative.
+    """
+
+    def __init__(self, arrays):
+        version, self.max_depth, self.n_features = (int(v) for v in arrays["meta"])
+        if version != FOREST_FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest format {version}")
+        # Plain ndarray views: np.memmap's subclass overhead adds up in the loop
+        self.feature = np.asarray(arrays["feature"])
+        self.threshold = np.asarray(arrays["threshold"])
+        self.left = np.asarray(arrays["left"])
+        self.right = np.asarray(arrays["right"])
+        self.value = np.asarray(arrays["value"])
+        self.roots = np.asarray(arrays["roots"])
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(_load_npz(path, mmap=mmap))
+
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        n, n_trees = X.shape[0], len(self.roots)
+        # Feature-major copy so a (feature, row) pair is one flat index
+        columns = X.T.astype(np.float64).ravel()
+
+        node = np.tile(self.roots.astype(np.intp), n)
+        row = np.repeat(np.arange(n, dtype=np.intp), n_trees)
+        if len(node) <= COMPACT_MIN_PAIRS:
+            # Small batches: a fixed max_depth walk beats the bookkeeping below
+            for _ in range(self.max_depth):
+                go_left = np.take(columns, np.take(self.feature, node) * n + row) <= np.take(self.threshold, node)
+                node = np.where(go_left, np.take(self.left, node), np.take(self.right, node))
+        else:
+            active = np.arange(len(node))
+            active_node, active_row = node.copy(), row
+            while len(active):
+                go_left = (np.take(columns, np.take(self.feature, active_node) * n + active_row)
+                           <= np.take(self.threshold, active_node))
+                next_node = np.where(go_left, np.take(self.left, active_node), np.take(self.right, active_node))
+                node[active] = next_node
+                # Leaves point at themselves
+                moving = next_node != active_node
+                active, active_node, active_row = active[moving], next_node[moving], active_row[moving]
+
+        leaf_values = np.take(self.value, node).reshape(n, n_trees)
+        out = np.zeros(n, dtype=np.float64)
+        for t in range(n_trees):
+            out += leaf_values[:, t]
+        out /= n_trees
+        return out
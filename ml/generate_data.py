@@ -1,26 +1,49 @@
-import pandas as pd
+import os
+import argparse
 import numpy as np
-import random
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+SOLS_PER_YEAR = 668
+CHUNK_ROWS = 500_000
+# Each Parquet file holds this many chunks, one row group per chunk
+CHUNKS_PER_FILE = 8
+
+def _station_offsets(station, seed):
+    """Per-station climate offsets (elevation, latitude); station 0 is the reference site."""
+    if station == 0:
+        return 0.0, 0.0
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(station,)))
+    return rng.normal(0, 5), rng.normal(0, 60)
+
+def generate_chunk(first_sol, n_sols, station=0, seed=None, chunk_index=0):
+    """
+    Generate n_sols consecutive sols (starting at first_sol) for one station.
+    Every (station, chunk_index) pair gets its own random stream, so output
+    is reproducible for a given seed no matter how chunks are scheduled.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(station, chunk_index)))
+    temp_offset, pressure_offset = _station_offsets(station, seed)
 
-def generate_mars_data():
-    # Simulate a Martian year (668 sols)
-    sols = np.arange(1, 669)
+    sols = np.arange(first_sol, first_sol + n_sols)
+    phase = 2 * np.pi * sols / SOLS_PER_YEAR
     # Seasonal effect on temperature (sinusoidal)
     # Avg temp -60C, fluctuation +/- 20C
-    min_temp = -60 + 20 * np.sin(2 * np.pi * sols / 668) + np.random.normal(0, 2, 668)
-    max_temp = -10 + 20 * np.sin(2 * np.pi * sols / 668) + np.random.normal(0, 2, 668)
+    season = 20 * np.sin(phase)
+    min_temp = -60 + temp_offset + season + rng.normal(0, 2, n_sols)
+    max_temp = -10 + temp_offset + season + rng.normal(0, 2, n_sols)
     avg_temp = (min_temp + max_temp) / 2
-    
+
     # Pressure (Pascals) - usually higher in winter
-    pressure = 800 + 50 * np.cos(2 * np.pi * sols / 668) + np.random.normal(0, 5, 668)
-    
+    pressure = 800 + pressure_offset + 50 * np.cos(phase) + rng.normal(0, 5, n_sols)
+
     # Wind Speed (m/s)
-    wind_speed = np.random.lognormal(mean=1.5, sigma=0.5, size=668)
-    
+    wind_speed = rng.lognormal(mean=1.5, sigma=0.5, size=n_sols)
+
     # Solar Longitude (0-360) loosely follows sols
-    ls = (sols / 668 * 360) % 360
-    
-    df = pd.DataFrame({
+    ls = (sols / SOLS_PER_YEAR * 360) % 360
+
+    return {
         'sol': sols,
         'ls': ls, # Solar Longitude
         'pressure': pressure,
@@ -28,13 +51,90 @@ def generate_mars_data():
         'min_temp': min_temp,
         'max_temp': max_temp,
         'avg_temp': avg_temp
-    })
-    
-    return df
+    }
+
+def iter_chunks(years=1, stations=1, seed=None, chunk_rows=CHUNK_ROWS):
+    """Yield (station, chunk_index, columns) covering every station and sol."""
+    total_sols = int(years * SOLS_PER_YEAR)
+    for station in range(stations):
+        for chunk_index, first in enumerate(range(0, total_sols, chunk_rows)):
+            n = min(chunk_rows, total_sols - first)
+            yield station, chunk_index, generate_chunk(first + 1, n, station, seed, chunk_index)
+
+def generate_mars_data(years=1, stations=1, seed=None):
+    """In-memory DataFrame of the synthetic data; use write_parquet for large runs."""
+    frames = []
+    for station, _, columns in iter_chunks(years, stations, seed):
+        frame = pd.DataFrame(columns)
+        if stations > 1:
+            frame.insert(0, 'station', np.int32(station))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def _write_partition(out_dir, station, part, first_chunk, n_chunks, total_sols, seed, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = os.path.join(out_dir, f"station={station}", f"part-{part:05d}.parquet")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = 0
+    writer = None
+    try:
+        for chunk_index in range(first_chunk, first_chunk + n_chunks):
+            first = chunk_index * chunk_rows
+            n = min(chunk_rows, total_sols - first)
+            table = pa.table(generate_chunk(first + 1, n, station, seed, chunk_index))
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            # One row group per chunk keeps peak memory at a single chunk
+            writer.write_table(table)
+            rows += n
+    finally:
+        if writer is not None:
+            writer.close()
+    return path, rows
+
+def write_parquet(out_dir, years=1, stations=1, seed=None, chunk_rows=CHUNK_ROWS, processes=None):
+    """
+    Stream the synthetic data to a Hive-partitioned Parquet dataset
+    (out_dir/station=K/part-NNNNN.parquet). Partitions are independent and
+    written in parallel by `processes` worker processes (default: all cores).
+    Returns the total number of rows written.
+    """
+    total_sols = int(years * SOLS_PER_YEAR)
+    n_chunks = -(-total_sols // chunk_rows)
+    if seed is None:
+        # Workers must share one entropy source to stay independent of each other
+        seed = np.random.SeedSequence().entropy
+
+    jobs = []
+    for station in range(stations):
+        for part, first_chunk in enumerate(range(0, n_chunks, CHUNKS_PER_FILE)):
+            jobs.append((out_dir, station, part, first_chunk, min(CHUNKS_PER_FILE, n_chunks - first_chunk),
+                         total_sols, seed, chunk_rows))
+
+    if processes == 1 or len(jobs) == 1:
+        results = [_write_partition(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_write_partition, *zip(*jobs)))
+    return sum(rows for _, rows in results)
 
 if __name__ == "__main__":
-    df = generate_mars_data()
-    import os
-    os.makedirs('data', exist_ok=True)
-    df.to_csv('data/mars_weather_synthetic.csv', index=False)
-    print("Synthetic Mars weather data generated and saved to data/mars_weather_synthetic.csv")
+    parser = argparse.ArgumentParser(description="Generate synthetic Mars weather data.")
+    parser.add_argument("--years", type=float, default=1, help="Martian years per station (668 sols each)")
+    parser.add_argument("--stations", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--parquet", metavar="DIR", help="write a partitioned Parquet dataset instead of the CSV")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.parquet:
+        rows = write_parquet(args.parquet, args.years, args.stations, args.seed, args.chunk_rows, args.processes)
+        print(f"Synthetic Mars weather data ({rows} rows) written to {args.parquet}")
+    else:
+        df = generate_mars_data(args.years, args.stations, args.seed)
+        os.makedirs('data', exist_ok=True)
+        df.to_csv('data/mars_weather_synthetic.csv', index=False)
+        print("Synthetic Mars weather data generated and saved to data/mars_weather_synthetic.csv")
@@ -0,0 +1,215 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import numpy as np
+
+HISTORY_CSV = 'data/mars_weather_synthetic.csv'
+# Partitioned dataset written by `python -m ml.generate_data --parquet data/mars_weather`
+HISTORY_PARQUET = 'data/mars_weather'
+COLUMN_CACHE_DIR = os.path.join(os.getenv("NASA_CACHE_DIR", ".cache"), "mars_weather")
+
+# Northern-hemisphere seasons by solar longitude
+SEASONS = ['Spring', 'Summer', 'Autumn', 'Winter']
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def _signature(source):
+    """(mtime_ns, size) of a file, or the newest mtime and total size of a dataset directory."""
+    if os.path.isdir(source):
+        mtime, size = 0, 0
+        for root, _, files in os.walk(source):
+            for name in files:
+                stat = os.stat(os.path.join(root, name))
+                mtime, size = max(mtime, stat.st_mtime_ns), size + stat.st_size
+        return [mtime, size]
+    stat = os.stat(source)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _convert(source, target):
+    """Write every column of source as <target>/<column>.npy."""
+    os.makedirs(target)
+    if os.path.isdir(source):
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(source, format='parquet', partitioning='hive')
+        total = dataset.count_rows()
+        columns = {}
+        offset = 0
+        # Stream record batches into preallocated .npy files, never holding the whole table
+        for batch in dataset.to_batches():
+            for name, array in zip(batch.schema.names, batch.columns):
+                values = array.to_numpy(zero_copy_only=False)
+                if name not in columns:
+                    columns[name] = np.lib.format.open_memmap(
+                        os.path.join(target, f'{name}.npy'), mode='w+', dtype=values.dtype, shape=(total,))
+                columns[name][offset:offset + len(values)] = values
+            offset += batch.num_rows
+        for column in columns.values():
+            column.flush()
+        return list(columns)
+
+    import pandas as pd
+    df = pd.read_csv(source)
+    for name in df.columns:
+        np.save(os.path.join(target, f'{name}.npy'), df[name].to_numpy())
+    return list(df.columns)
+
+
+class MarsHistory:
+    """
+    Historical Mars weather held as memory-mapped NumPy columns.
+
+    The CSV or Parquet source is converted once into per-column .npy files
+    under .cache/ and rebuilt whenever the source changes; every later
+    process just memory-maps them. Rows are expected in (station, sol) order,
+    as written by ml.generate_data, so sol ranges are binary searches.
+    """
+
+    def __init__(self, source, directory, version, column_names):
+        self.source = source
+        self.version = version
+        self.columns = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                        for name in column_names}
+        self._season_stats = None
+        self._segments = self._find_segments()
+
+    def _find_segments(self):
+        """(station, start, end) runs of rows; one run with station None if there is no station column."""
+        n = len(self.columns['sol'])
+        if 'station' not in self.columns:
+            return [(None, 0, n)]
+        station = np.asarray(self.columns['station'])
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(station)) + 1])
+        ends = np.concatenate([starts[1:], [n]])
+        return [(int(station[s]), int(s), int(e)) for s, e in zip(starts, ends)]
+
+    @property
+    def stations(self):
+        return sorted({station for station, _, _ in self._segments if station is not None})
+
+    @property
+    def default_station(self):
+        """Station to chart when the caller doesn't pick one (None for single-station data)."""
+        return self.stations[0] if self.stations else None
+
+    def sol_bounds(self, station=None):
+        """(first_sol, last_sol) over all rows, or over one station's rows."""
+        sol = self.columns['sol']
+        bounds = [(int(sol[start]), int(sol[end - 1])) for seg_station, start, end in self._segments
+                  if end > start and (station is None or seg_station == station)]
+        if not bounds:
+            return None
+        return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+    def __len__(self):
+        return len(self.columns['sol'])
+
+    def frame(self, columns=None, sols=None, station=None):
+        """
+        DataFrame of the requested columns (default: all), optionally limited
+        to an inclusive (first_sol, last_sol) range and/or one station.
+        """
+        import pandas as pd
+        names = list(columns or self.columns)
+        pieces = []
+        for seg_station, start, end in self._segments:
+            if station is not None and seg_station != station:
+                continue
+            if sols is not None:
+                sol = self.columns['sol'][start:end]
+                lo = start + int(np.searchsorted(sol, sols[0], side='left'))
+                hi = start + int(np.searchsorted(sol, sols[1], side='right'))
+                start, end = lo, hi
+            pieces.append((start, end))
+        data = {name: np.concatenate([self.columns[name][s:e] for s, e in pieces]) if pieces
+                else self.columns[name][:0] for name in names}
+        return pd.DataFrame(data, columns=names)
+
+    def season_stats(self):
+        """Per-season row count and temperature/pressure/wind aggregates, computed once."""
+        if self._season_stats is None:
+            import pandas as pd
+            season = np.minimum((np.asarray(self.columns['ls']) // 90).astype(np.int64), 3)
+            count = np.bincount(season, minlength=4)
+            stats = {'season': SEASONS, 'sols': count}
+            for name in ('avg_temp', 'pressure', 'wind_speed'):
+                values = np.asarray(self.columns[name])
+                stats[f'mean_{name}'] = np.bincount(season, weights=values, minlength=4) / np.maximum(count, 1)
+            avg_temp = np.asarray(self.columns['avg_temp'])
+            stats['lowest_avg_temp'] = [avg_temp[season == s].min() if count[s] else np.nan for s in range(4)]
+            stats['highest_avg_temp'] = [avg_temp[season == s].max() if count[s] else np.nan for s in range(4)]
+            self._season_stats = pd.DataFrame(stats)
+        return self._season_stats
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _open(source, attempts=3):
+    signature = _signature(source)
+    key = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:12]
+    directory = os.path.join(COLUMN_CACHE_DIR, key)
+    manifest_path = os.path.join(directory, 'manifest.json')
+    manifest = _read_manifest(manifest_path)
+
+    if manifest is None or manifest['signature'] != signature:
+        # Build next to the final location, then swap it in
+        staging = f"{directory}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        column_names = _convert(source, staging)
+        manifest = {'source': source, 'signature': signature, 'columns': column_names}
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        for attempt in range(attempts):
+            # Another process (worker, or ml.train_model) may have swapped the same build in first
+            existing = _read_manifest(manifest_path)
+            if existing is not None and existing['signature'] == signature:
+                shutil.rmtree(staging, ignore_errors=True)
+                manifest = existing
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            try:
+                os.replace(staging, directory)
+                break
+            except OSError:
+                # Lost the race between rmtree and replace; check what won
+                if attempt == attempts - 1:
+                    shutil.rmtree(staging, ignore_errors=True)
+                    raise
+
+    version = hashlib.sha1(json.dumps(signature).encode()).hexdigest()[:12]
+    try:
+        return MarsHistory(source, directory, version, manifest['columns'])
+    except FileNotFoundError:
+        # Removed by a concurrent rebuild before we mapped it
+        if attempts <= 1:
+            raise
+        return _open(source, attempts - 1)
+
+
+def get_history(source=None):
+    """
+    Process-wide MarsHistory for source (default: the Parquet dataset if it
+    exists, else the CSV). Returns None when there is no data.
+    """
+    if source is None:
+        source = HISTORY_PARQUET if os.path.isdir(HISTORY_PARQUET) else HISTORY_CSV
+    if not os.path.exists(source):
+        return None
+    signature = _signature(source)
+    with _histories_lock:
+        cached = _histories.get(source)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        history = _open(source)
+        _histories[source] = (signature, history)
+        return history
@@ -1,22 +1,175 @@
-import joblib
-import pandas as pd
 import os
+import threading
+from utils import metrics
+
+MODEL_PATH = 'models/mars_temp_model.pkl'
+FEATURES = ['ls', 'pressure', 'wind_speed']
+# Batches at least this large go to the pickled model in engine='auto':
+# FlatForest wins on small batches (no sklearn import, ~0.2 ms per row vs
+# ~8 ms per call) but sklearn's tree walk in C is ~4x faster at 10,000 rows
+SKLEARN_MIN_BATCH_ROWS = 500
+
+# (kind, abs path, mmap_mode) -> ((mtime_ns, size), model), shared by all sessions
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+def _cached_load(kind, path, mmap_mode, loader):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (kind, os.path.abspath(path), mmap_mode)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _model_cache_lock:
+        cached = _model_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with metrics.timer("model_load_ms", kind=kind):
+            model = loader(path, mmap_mode)
+        _model_cache[key] = (signature, model)
+        return model
+
+def _load_pickle(path, mmap_mode):
+    # joblib (and sklearn, when the model unpickles) load on first use
+    import joblib
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+def _load_flat(path, mmap_mode):
+    from ml.forest import FlatForest
+    return FlatForest.load(path, mmap=mmap_mode is not None)
+
+def load_model(model_path=MODEL_PATH, mmap_mode=None):
+    """
+    Load a pickled model once per process and reuse it until the file changes.
+    mmap_mode='r' memory-maps the model's arrays (joblib) so several workers
+    share the same pages instead of each holding a copy.
+    """
+    return _cached_load("pickle", model_path, mmap_mode, _load_pickle)
+
+def load_flat_forest(forest_path, mmap_mode='r'):
+    """Cached counterpart of load_model for the .npz export from ml.forest."""
+    return _cached_load("flat", forest_path, mmap_mode, _load_flat)
+
+def forest_path_for(model_path):
+    """The flat-array export that train_model writes next to a pickled model."""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+def load_surface(model_path=MODEL_PATH):
+    """The prediction surface built for this exact model file, or None."""
+    from ml.surface import Surface, model_version, surface_paths
+    values_path = surface_paths(model_path)[0]
+    surface = _cached_load("surface", values_path, None, lambda path, _: Surface.load(model_path))
+    version = _cached_load("version", model_path, None, lambda path, _: model_version(path))
+    if surface is None or surface.meta.get('model_version') != version:
+        # Missing, or built for a different model
+        return None
+    return surface
 
 class MarsPredictor:
-    def __init__(self, model_path='models/mars_temp_model.pkl'):
-        if os.path.exists(model_path):
-            self.model = joblib.load(model_path)
+    """
+    engine='flat' evaluates the NumPy export of the forest (no sklearn import),
+    engine='sklearn' the pickled model. 'auto' prefers the export when it is
+    at least as new as the pickle, but hands batches of SKLEARN_MIN_BATCH_ROWS
+    or more to the pickled model when it can be loaded (both give identical
+    predictions).
+
+    mode='lookup' answers from the precomputed grid in ml.surface by trilinear
+    interpolation, falling back to the model outside the grid (or when no
+    surface matching this model exists).
+
+    version selects a model from the ml.registry instead of model_path:
+    'best' (optionally within latency_budget_ms), 'latest', 'pinned' or an
+    explicit version such as 'v0003'.
+    """
+    def __init__(self, model_path=MODEL_PATH, mmap_mode=None, engine='auto', mode='model',
+                 version=None, latency_budget_ms=None):
+        self.version = None
+        if version is not None:
+            from ml.registry import ModelRegistry
+            registry = ModelRegistry()
+            self.version = registry.resolve(version, latency_budget_ms)
+            if self.version is None:
+                # Empty registry or nothing within the latency budget
+                self.engine, self.model, self.surface = None, None, None
+                return
+            model_path = registry.model_path(self.version)
+        forest_path = forest_path_for(model_path)
+        self.model_path = model_path
+        self.mmap_mode = mmap_mode
+        self._auto = engine == 'auto'
+        if engine == 'auto':
+            engine = 'flat' if self._export_is_current(model_path, forest_path) else 'sklearn'
+        self.engine = engine
+        if engine == 'flat':
+            self.model = load_flat_forest(forest_path, mmap_mode or 'r')
         else:
-            self.model = None
+            self.model = load_model(model_path, mmap_mode)
+        self.surface = None
+        if mode == 'lookup' and self.model:
+            self.surface = load_surface(model_path)
+
+    @property
+    def max_interpolation_error(self):
+        """Largest |lookup - model| seen when the surface was built, or None."""
+        return self.surface.meta.get('max_error') if self.surface is not None else None
+
+    @staticmethod
+    def _export_is_current(model_path, forest_path):
+        if not os.path.exists(forest_path):
+            return False
+        return not os.path.exists(model_path) or os.path.getmtime(forest_path) >= os.path.getmtime(model_path)
 
     def predict(self, ls, pressure, wind_speed):
         if not self.model:
             return None
-        
-        input_data = pd.DataFrame({
-            'ls': [ls],
-            'pressure': [pressure],
-            'wind_speed': [wind_speed]
-        })
-        
-        return self.model.predict(input_data)[0]
+
+        return self.predict_batch([[ls, pressure, wind_speed]])[0]
+
+    def predict_batch(self, X):
+        """
+        Predict many rows at once. X is a DataFrame with ls/pressure/wind_speed
+        columns, a dict of those columns, or an (n, 3) array in that order.
+        Returns a NumPy array of n temperatures.
+        """
+        if not self.model:
+            return None
+
+        import numpy as np
+        if isinstance(X, dict) or hasattr(X, 'columns'):
+            X = np.column_stack([np.asarray(X[name], dtype=np.float64) for name in FEATURES])
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+
+        mode = 'model' if self.surface is None else 'lookup'
+        inside = None if self.surface is None else self.surface.contains(X)
+        # Engine is picked by how many rows actually reach the model
+        engine, model = self._model_for(len(X) if inside is None else int((~inside).sum()))
+        metrics.inc("model_predicted_rows_total", len(X), engine=engine, mode=mode)
+        with metrics.timer("model_predict_ms", engine=engine, mode=mode):
+            if self.surface is None:
+                return self._predict_model(engine, model, X)
+            out = np.empty(len(X), dtype=np.float64)
+            out[inside] = self.surface.interpolate(X[inside])
+            if not inside.all():
+                out[~inside] = self._predict_model(engine, model, X[~inside])
+            return out
+
+    def _model_for(self, rows):
+        """(engine, model) to evaluate a batch of `rows` with."""
+        if self._auto and self.engine == 'flat' and rows >= SKLEARN_MIN_BATCH_ROWS:
+            try:
+                model = load_model(self.model_path, self.mmap_mode)
+            except ImportError:
+                # joblib/sklearn not installed: the export is all we have
+                model = None
+            if model is not None:
+                return 'sklearn', model
+        return self.engine, self.model
+
+    @staticmethod
+    def _predict_model(engine, model, X):
+        if engine == 'flat':
+            return model.predict(X)
+
+        import pandas as pd
+        # The model was fitted on named columns, so keep them to avoid sklearn warnings
+        return model.predict(pd.DataFrame(X, columns=FEATURES))
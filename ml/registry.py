@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import shutil
+import datetime
+import numpy as np
+from ml.predictor import MarsPredictor, MODEL_PATH, forest_path_for
+
+REGISTRY_DIR = 'models/registry'
+MODEL_FILE = 'model.pkl'
+
+
+class ModelRegistry:
+    """
+    Versioned model store: models/registry/<version>/ holds the pickle, its
+    flat-array export and prediction surface, and manifest.json records
+    metrics, training time, size and inference latency for every version.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, 'manifest.json')
+
+    def _load(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'versions': [], 'pinned': None}
+
+    def _save(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    @property
+    def versions(self):
+        return self._load()['versions']
+
+    def model_path(self, version):
+        return os.path.join(self.root, version, MODEL_FILE)
+
+    def get(self, version):
+        for entry in self.versions:
+            if entry['version'] == version:
+                return entry
+        raise KeyError(f"Unknown model version {version}")
+
+    def register(self, model, metrics, params, train_seconds, build_surface=True):
+        """Save a fitted model as the next version, measure it and record it in the manifest."""
+        import joblib
+        from ml.forest import export_forest
+
+        manifest = self._load()
+        version = f"v{len(manifest['versions']) + 1:04d}"
+        directory = os.path.join(self.root, version)
+        os.makedirs(directory)
+        model_path = os.path.join(directory, MODEL_FILE)
+        joblib.dump(model, model_path)
+        export_forest(model, forest_path_for(model_path))
+        if build_surface:
+            from ml.surface import build_surface as build
+            build(model_path)
+
+        entry = {
+            'version': version,
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'params': params,
+            'metrics': metrics,
+            'train_seconds': round(train_seconds, 3),
+            'size_bytes': sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)),
+            'n_trees': len(getattr(model, 'estimators_', [model])),
+            'latency': measure_latency(model_path),
+        }
+        manifest['versions'].append(entry)
+        self._save(manifest)
+        return entry
+
+    def pin(self, version):
+        """Make resolve('pinned') (and resolve(None)) return this version; None unpins."""
+        manifest = self._load()
+        if version is not None:
+            self.get(version)
+        manifest['pinned'] = version
+        self._save(manifest)
+
+    def resolve(self, version='best', latency_budget_ms=None):
+        """
+        Version name for 'latest', 'best' (lowest test RMSE whose single-row
+        latency fits the budget), 'pinned' or an explicit version. None means
+        the pinned version if any, else best.
+        """
+        manifest = self._load()
+        entries = manifest['versions']
+        if not entries:
+            return None
+        if version is None:
+            version = 'pinned' if manifest['pinned'] else 'best'
+        if version == 'pinned':
+            return manifest['pinned']
+        if version == 'latest':
+            return entries[-1]['version']
+        if version == 'best':
+            candidates = [e for e in entries
+                          if latency_budget_ms is None or e['latency']['single_p95_ms'] <= latency_budget_ms]
+            if not candidates:
+                return None
+            return min(candidates, key=lambda e: e['metrics']['rmse'])['version']
+        return self.get(version)['version']
+
+    def promote(self, version, model_path=MODEL_PATH):
+        """Copy a version's artifacts to the default model path the dashboard loads."""
+        source = self.model_path(version)
+        source_base, target_base = os.path.splitext(source)[0], os.path.splitext(model_path)[0]
+        os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+        for suffix in ('.pkl', '.npz', '.surface.npy', '.surface.json'):
+            if os.path.exists(source_base + suffix):
+                shutil.copyfile(source_base + suffix, target_base + suffix)
+
+
+def measure_latency(model_path, repeats=200, batch_rows=1000, seed=0):
+    """Single-row p50/p95 and batch latency (ms) of both inference engines."""
+    rng = np.random.default_rng(seed)
+    rows = rng.uniform([0, 600, 0], [360, 1200, 20], size=(repeats, 3))
+    batch = rng.uniform([0, 600, 0], [360, 1200, 20], size=(batch_rows, 3))
+    result = {}
+    for engine in ('flat', 'sklearn'):
+        predictor = MarsPredictor(model_path, engine=engine)
+        predictor.predict(*rows[0])  # warm-up
+        timings = []
+        for row in rows:
+            start = time.perf_counter()
+            predictor.predict(*row)
+            timings.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        predictor.predict_batch(batch)
+        result[engine] = {
+            'single_p50_ms': round(float(np.percentile(timings, 50)), 4),
+            'single_p95_ms': round(float(np.percentile(timings, 95)), 4),
+            f'batch_{batch_rows}_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+    # Serving uses the faster engine
+    best = min(result.values(), key=lambda r: r['single_p95_ms'])
+    result['single_p95_ms'] = best['single_p95_ms']
+    return result
@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import numpy as np
+from ml.predictor import MarsPredictor, MODEL_PATH
+
+# (start, stop, points) per feature, matching the Mars weather sliders
+GRID = {
+    'ls': (0.0, 360.0, 121),
+    'pressure': (600.0, 1200.0, 61),
+    'wind_speed': (0.0, 20.0, 41),
+}
+CHUNK_ROWS = 20000
+
+
+def surface_paths(model_path=MODEL_PATH):
+    base = os.path.splitext(model_path)[0]
+    return base + '.surface.npy', base + '.surface.json'
+
+
+def model_version(model_path=MODEL_PATH):
+    """Content hash of the model file, used to tie a surface to its model."""
+    digest = hashlib.sha1()
+    with open(model_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class Surface:
+    """Model predictions on a regular (ls, pressure, wind_speed) grid, with trilinear lookup."""
+
+    def __init__(self, values, axes, meta=None):
+        self.values = values
+        self.axes = axes
+        self.meta = meta or {}
+        self.lower = np.array([axes[name][0] for name in ('ls', 'pressure', 'wind_speed')])
+        self.upper = np.array([axes[name][1] for name in ('ls', 'pressure', 'wind_speed')])
+        self.points = np.array([axes[name][2] for name in ('ls', 'pressure', 'wind_speed')])
+        self.step = (self.upper - self.lower) / (self.points - 1)
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH):
+        values_path, meta_path = surface_paths(model_path)
+        if not (os.path.exists(values_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        values = np.load(values_path, mmap_mode='r')
+        return cls(values, {name: tuple(axis) for name, axis in meta['axes'].items()}, meta)
+
+    def contains(self, X):
+        X = np.atleast_2d(X)
+        return np.all((X >= self.lower) & (X <= self.upper), axis=1)
+
+    def interpolate(self, X):
+        """Trilinear interpolation for rows of X that lie inside the grid."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        position = (X - self.lower) / self.step
+        index = np.clip(np.floor(position).astype(np.int64), 0, self.points - 2)
+        frac = position - index
+        i, j, k = index[:, 0], index[:, 1], index[:, 2]
+        fx, fy, fz = frac[:, 0], frac[:, 1], frac[:, 2]
+        v = self.values
+        c00 = v[i, j, k] * (1 - fx) + v[i + 1, j, k] * fx
+        c01 = v[i, j, k + 1] * (1 - fx) + v[i + 1, j, k + 1] * fx
+        c10 = v[i, j + 1, k] * (1 - fx) + v[i + 1, j + 1, k] * fx
+        c11 = v[i, j + 1, k + 1] * (1 - fx) + v[i + 1, j + 1, k + 1] * fx
+        c0 = c00 * (1 - fy) + c10 * fy
+        c1 = c01 * (1 - fy) + c11 * fy
+        return c0 * (1 - fz) + c1 * fz
+
+    def axis_values(self, name):
+        start, stop, points = self.axes[name]
+        return np.linspace(start, stop, int(points))
+
+
+def build_surface(model_path=MODEL_PATH, grid=GRID, error_samples=20000, seed=0):
+    """
+    Evaluate the model over the grid, save it as a memory-mappable .npy plus
+    a JSON sidecar (axes, model version, interpolation error) and return the
+    Surface. The error is measured against the model at random off-grid points.
+    """
+    # Offline step: sklearn's compiled predict is the fastest for big batches
+    engine = 'sklearn' if os.path.exists(model_path) else 'flat'
+    predictor = MarsPredictor(model_path, engine=engine)
+    if not predictor.model:
+        raise FileNotFoundError(f"Model not found at {model_path}")
+
+    axes = {name: grid[name] for name in ('ls', 'pressure', 'wind_speed')}
+    ls, pressure, wind = (np.linspace(*axes[name][:2], axes[name][2]) for name in axes)
+    mesh = np.stack(np.meshgrid(ls, pressure, wind, indexing='ij'), axis=-1).reshape(-1, 3)
+    flat = np.concatenate([predictor.predict_batch(mesh[i:i + CHUNK_ROWS])
+                           for i in range(0, len(mesh), CHUNK_ROWS)])
+    values = flat.reshape(len(ls), len(pressure), len(wind))
+
+    surface = Surface(values, axes)
+    rng = np.random.default_rng(seed)
+    sample = rng.uniform(surface.lower, surface.upper, size=(error_samples, 3))
+    error = np.abs(surface.interpolate(sample) - predictor.predict_batch(sample))
+
+    values_path, meta_path = surface_paths(model_path)
+    np.save(values_path, values)
+    surface.meta = {
+        'model_version': model_version(model_path),
+        'axes': {name: list(axis) for name, axis in axes.items()},
+        'max_error': float(error.max()),
+        'mean_error': float(error.mean()),
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(surface.meta, f, indent=2)
+    return surface
+
+
+if __name__ == "__main__":
+    surface = build_surface()
+    print(f"Prediction surface saved to {surface_paths()[0]} "
+          f"(max interpolation error {surface.meta['max_error']:.2f} C, mean {surface.meta['mean_error']:.2f} C)")
@@ -1,38 +1,97 @@
-import pandas as pd
+import time
+import argparse
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, RandomizedSearchCV, KFold
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
-import os
+from ml.history import get_history
+from ml.registry import ModelRegistry
 
-def train():
-    data_path = 'data/mars_weather_synthetic.csv'
-    if not os.path.exists(data_path):
+FEATURES = ['ls', 'pressure', 'wind_speed']
+
+# Sampled by RandomizedSearchCV; n_estimators is also the main latency knob
+PARAM_DISTRIBUTIONS = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 12, 20],
+    'min_samples_leaf': [1, 2, 5],
+    'max_features': [1.0, 0.66, 'sqrt'],
+}
+
+def train(search=True, n_iter=12, cv=5, n_jobs=-1, warm_start=False, extra_trees=50,
+          latency_budget_ms=None):
+    history = get_history()
+    if history is None:
         print("Data file not found. Please run generate_data.py first.")
         return
 
-    df = pd.read_csv(data_path)
+    df = history.frame(FEATURES + ['avg_temp'])
     
     # Features: Solar Longitude, Pressure, Wind Speed
-    X = df[['ls', 'pressure', 'wind_speed']]
+    X = df[FEATURES]
     # Target: Avg Temperature
     y = df['avg_temp']
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    registry = ModelRegistry()
     
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    start = time.perf_counter()
+    latest = registry.resolve('latest')
+    if warm_start and latest:
+        # Grow the latest forest with trees fitted on the current data
+        model = joblib.load(registry.model_path(latest))
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra_trees, n_jobs=n_jobs)
+        model.fit(X_train, y_train)
+        params = dict(registry.get(latest)['params'], n_estimators=model.n_estimators, warm_started_from=latest)
+    elif search:
+        # Cross-validated search, candidates and folds spread over all cores
+        searcher = RandomizedSearchCV(
+            RandomForestRegressor(random_state=42),
+            PARAM_DISTRIBUTIONS,
+            n_iter=n_iter,
+            cv=KFold(n_splits=cv, shuffle=True, random_state=42),
+            scoring='neg_root_mean_squared_error',
+            n_jobs=n_jobs,
+            random_state=42,
+        )
+        searcher.fit(X_train, y_train)
+        model = searcher.best_estimator_
+        params = dict(searcher.best_params_, cv_rmse=float(-searcher.best_score_))
+    else:
+        model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs)
+        model.fit(X_train, y_train)
+        params = {'n_estimators': 100}
+    train_seconds = time.perf_counter() - start
+    # Serve single-threaded: thread start-up dominates one-row predictions
+    model.set_params(n_jobs=None, warm_start=False)
     
     predictions = model.predict(X_test)
     rmse = np.sqrt(mean_squared_error(y_test, predictions))
     r2 = r2_score(y_test, predictions)
     
-    print(f"Model Trained. RMSE: {rmse:.2f}, R2: {r2:.2f}")
+    print(f"Model Trained in {train_seconds:.1f}s. RMSE: {rmse:.2f}, R2: {r2:.2f}")
+    
+    entry = registry.register(model, {'rmse': float(rmse), 'r2': float(r2)}, params, train_seconds)
+    print(f"Registered {entry['version']} ({entry['size_bytes'] / 1e6:.1f} MB, "
+          f"single prediction p95 {entry['latency']['single_p95_ms']:.2f} ms)")
     
-    os.makedirs('models', exist_ok=True)
-    joblib.dump(model, 'models/mars_temp_model.pkl')
-    print("Model saved to models/mars_temp_model.pkl")
+    best = registry.resolve(None, latency_budget_ms)
+    if best:
+        registry.promote(best)
+        print(f"Model {best} saved to models/mars_temp_model.pkl")
+    else:
+        print(f"No model meets the {latency_budget_ms} ms latency budget; default model left unchanged")
+    return entry
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the Mars temperature model.")
+    parser.add_argument("--no-search", action="store_true", help="fit the fixed 100-tree baseline")
+    parser.add_argument("--n-iter", type=int, default=12, help="hyperparameter candidates to try")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel jobs (-1: all cores)")
+    parser.add_argument("--warm-start", action="store_true", help="grow the latest registered forest instead")
+    parser.add_argument("--extra-trees", type=int, default=50)
+    parser.add_argument("--latency-budget-ms", type=float, default=None)
+    args = parser.parse_args()
+    train(search=not args.no_search, n_iter=args.n_iter, cv=args.cv, n_jobs=args.jobs,
+          warm_start=args.warm_start, extra_trees=args.extra_trees, latency_budget_ms=args.latency_budget_ms)
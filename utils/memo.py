@@ -0,0 +1,94 @@
+import json
+import pickle
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
+import numpy as np
+
+
+def _update(h, value):
+    """Feed a value's content (not its identity) into hash object h."""
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        h.update(b"df")
+        h.update(json.dumps([list(map(str, value.columns)), list(map(str, value.dtypes))]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(b"series")
+        h.update(f"{value.name}|{value.dtype}".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"ndarray|{value.dtype}|{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else pickle.dumps(value))
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}|{len(value)}".encode())
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        try:
+            # Plain JSON payloads (API responses) hash in one C-level pass
+            h.update(b"json" + json.dumps(value, sort_keys=True).encode())
+        except TypeError:
+            h.update(f"dict|{len(value)}".encode())
+            for k in sorted(value, key=repr):
+                _update(h, k)
+                _update(h, value[k])
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        h.update(f"{type(value).__name__}|{value!r}".encode())
+    else:
+        h.update(pickle.dumps(value))
+
+
+def content_key(*values):
+    """Hex digest of the contents of values; equal data gives equal keys."""
+    h = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _update(h, value)
+    return h.hexdigest()
+
+
+def memoize(maxsize=32, key=None):
+    """
+    Cache a function's results in a bounded LRU keyed by the content of its
+    arguments, so Streamlit reruns with unchanged inputs skip the work.
+
+    key, if given, is called with the same arguments and returns a cheaper
+    stand-in for them (e.g. a dataset version instead of the dataset).
+    Cached results are shared between callers and must not be mutated.
+    """
+    def decorator(fn):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        stats = {"hits": 0, "misses": 0}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            k = content_key(key(*args, **kwargs) if key else (args, kwargs))
+            with lock:
+                if k in cache:
+                    cache.move_to_end(k)
+                    stats["hits"] += 1
+                    return cache[k]
+                stats["misses"] += 1
+            result = fn(*args, **kwargs)
+            with lock:
+                cache[k] = result
+                cache.move_to_end(k)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        def cache_info():
+            with lock:
+                return {**stats, "size": len(cache), "maxsize": maxsize}
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
@@ -0,0 +1,206 @@
+import os
+import time
+import bisect
+import threading
+import functools
+
+# Set ASTROINTEL_METRICS=1 to collect; when off every hook returns immediately
+ENABLED = os.getenv("ASTROINTEL_METRICS") == "1"
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+PREFIX = "astrointel_"
+
+_lock = threading.Lock()
+# (name, labels) -> value
+_counters = {}
+# (name, labels) -> [bucket counts (last one is +Inf), sum, count]
+_histograms = {}
+_http_server = None
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def inc(name, value=1, **labels):
+    """Add value to counter name{labels}."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, ms, **labels):
+    """Record one duration (ms) in histogram name{labels}."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    index = bisect.bisect_left(BUCKETS_MS, ms)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(BUCKETS_MS) + 1), 0.0, 0]
+        histogram[0][index] += 1
+        histogram[1] += ms
+        histogram[2] += 1
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, (time.perf_counter() - self.start) * 1000, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """Context manager recording the block's duration in histogram name{labels}."""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name, **labels):
+    """Decorator form of timer()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Timer(name, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _quantile(buckets, count, q):
+    """Estimate a quantile from bucket counts, interpolating inside the bucket."""
+    target = q * count
+    seen = 0
+    for i, n in enumerate(buckets):
+        if n and seen + n >= target:
+            lower = BUCKETS_MS[i - 1] if i > 0 else 0.0
+            upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else BUCKETS_MS[-1]
+            return lower + (upper - lower) * (target - seen) / n
+        seen += n
+    return None
+
+
+def snapshot():
+    """Current counters and histogram summaries as lists of plain dicts."""
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), (buckets, total, count) in sorted(_histograms.items()):
+            histograms.append({
+                "name": name, "labels": dict(labels), "count": count,
+                "mean_ms": total / count if count else None,
+                "p50_ms": _quantile(buckets, count, 0.50),
+                "p95_ms": _quantile(buckets, count, 0.95),
+                "p99_ms": _quantile(buckets, count, 0.99),
+            })
+    return {"counters": counters, "histograms": histograms}
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(b), s, c)) for key, (b, s, c) in _histograms.items())
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            typed.add(name)
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+    for (name, labels), (buckets, total, count) in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, n in zip(list(BUCKETS_MS) + ["+Inf"], buckets):
+            cumulative += n
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """Write prometheus_text() to path (default $ASTROINTEL_METRICS_FILE) for a textfile collector."""
+    path = path or os.getenv("ASTROINTEL_METRICS_FILE")
+    if not path:
+        return None
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+    return path
+
+
+def start_http_server(port, host="0.0.0.0"):
+    """Serve prometheus_text() at http://host:port/metrics from a daemon thread (once per process)."""
+    global _http_server
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _lock:
+        if _http_server is None:
+            _http_server = ThreadingHTTPServer((host, port), Handler)
+            _http_server.daemon_threads = True
+            threading.Thread(target=_http_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _http_server
@@ -1,13 +1,51 @@
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
+import numpy as np
+from utils.memo import memoize
 
-def plot_temp_predictions(history_df, current_pred=None):
+# plotly and pandas are imported inside the builders so importing this
+# module (e.g. from a page that may not draw a chart) stays cheap
+
+# Above this many points traces are drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = 1000
+# Line charts are downsampled to two points (min and max) per horizontal pixel
+CHART_WIDTH_PX = 1200
+
+def downsample_minmax(y, buckets):
+    """
+    Indices of the minimum and maximum of y in each of `buckets` equal runs
+    of points, plus the first and last point, in order. Keeps every peak and
+    trough a line chart of `buckets` pixels can show.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+def plot_temp_predictions(history_df, current_pred=None, width_px=CHART_WIDTH_PX):
     """
     Plot historical temperature trend and current prediction point.
+    Long histories are min/max downsampled to width_px buckets and drawn
+    with WebGL; pass a narrower sol range for full resolution.
+    Not memoized here: hashing a multi-million-row history costs about as
+    much as drawing it, so pages cache it by history version instead.
     """
-    fig = px.line(history_df, x='sol', y='avg_temp', title='Historical Mars Temperature (Avg)',
-                  labels={'sol': 'Sol (Martian Day)', 'avg_temp': 'Temperature (C)'})
+    import plotly.graph_objects as go
+
+    sol = np.asarray(history_df['sol'])
+    temp = np.asarray(history_df['avg_temp'], dtype=np.float64)
+    keep = downsample_minmax(temp, width_px)
+    trace = go.Scattergl if len(keep) > WEBGL_THRESHOLD else go.Scatter
+    fig = go.Figure(trace(x=sol[keep], y=temp[keep].astype(np.float32), mode='lines'))
+    fig.update_layout(title='Historical Mars Temperature (Avg)',
+                      xaxis_title='Sol (Martian Day)', yaxis_title='Temperature (C)')
     
     if current_pred is not None:
         # Add a marker for the prediction
@@ -17,22 +55,44 @@ def plot_temp_predictions(history_df, current_pred=None):
     fig.update_layout(template="plotly_dark")
     return fig
 
+@memoize(maxsize=16)
+def plot_season_heatmap(ls_values, pressure_values, temps, wind_speed):
+    """
+    Heatmap of predicted temperature over season (Ls) and pressure at a fixed
+    wind speed. temps has shape (len(ls_values), len(pressure_values)).
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(x=ls_values, y=pressure_values, z=temps.T,
+                               colorscale="Inferno", colorbar={"title": "Temp (C)"}))
+    fig.update_layout(title=f"Predicted Temperature by Season and Pressure (wind {wind_speed:.1f} m/s)",
+                      xaxis_title="Solar Longitude (deg)", yaxis_title="Pressure (Pa)",
+                      template="plotly_dark")
+    return fig
+
+@memoize(maxsize=16)
 def plot_neo_scatter(neo_data):
     """
     Scatter plot of Near Earth Objects: Miss Distance vs Relative Velocity
-    Sized by Diameter.
+    Sized by Diameter. Accepts the DataFrame from api.neo.flatten_neo_feed
+    (or a list of dicts with the same columns).
     """
-    if not neo_data:
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    if neo_data is None or len(neo_data) == 0:
         return go.Figure()
         
-    df = pd.DataFrame(neo_data)
+    df = neo_data if isinstance(neo_data, pd.DataFrame) else pd.DataFrame(neo_data)
     
     fig = px.scatter(df, x="miss_distance_km", y="velocity_kph", 
                      size="diameter_min_km", color="hazardous",
                      hover_data=["name", "close_approach_date"],
                      title="Near Earth Objects (NEO) - Approach Data",
                      labels={"miss_distance_km": "Miss Distance (km)", "velocity_kph": "Relative Velocity (kph)"},
-                     color_discrete_map={True: "red", False: "cyan"})
+                     color_discrete_map={True: "red", False: "cyan"},
+                     render_mode="webgl" if len(df) > WEBGL_THRESHOLD else "svg")
     
     fig.update_layout(template="plotly_dark")
     return fig